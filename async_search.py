@@ -0,0 +1,456 @@
+"""
+Búsquedas concurrentes con asyncio sobre un único Chromium (DevTools Protocol)
+
+En lugar de un navegador por búsqueda, se lanza un solo Chromium y cada búsqueda
+se ejecuta en su propia pestaña dentro de un contexto aislado (cookies y caché
+separadas). Las esperas de red de varias búsquedas se solapan, y un límite
+global más otro por buscador evitan superar los límites de los buscadores.
+
+Uso:
+    python async_search.py busquedas.txt [--engines bing,google] [--concurrency 4]
+
+Desde código:
+    resultados = asyncio.run(search_many(["Noticias hoy"], engines=["bing"]))
+"""
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import websockets
+
+from browser_profiles import load_cookie_jar, save_cookie_jar
+from extraction import EXTRACT_JS, normalize_result
+from result_writer import ResultWriter
+from readiness import get_profile
+from resource_blocking import blocked_patterns
+from selector_strategy import get_strategy
+from search_google import (BLOCK_PAGE_SELECTOR, BLOCK_URL_MARKERS, CATCH_ALL_SELECTORS,
+                           CONTAINER_SELECTORS, COOKIE_SELECTORS, RESULT_SELECTORS,
+                           SNIPPET_SELECTORS, TITLE_SELECTORS, build_chrome_options,
+                           build_search_url, load_queries, log_error, log_info,
+                           log_success, log_warning)
+
+# Pestañas simultáneas por buscador (se puede cambiar con ENGINE_CONCURRENCY=google=2,bing=4)
+DEFAULT_ENGINE_LIMITS = {"google": 2, "bing": 4}
+
+CHROME_BINARIES = ("chromium", "chromium-browser", "google-chrome", "google-chrome-stable")
+
+# Campos de Network.Cookie que acepta Storage.setCookies
+_COOKIE_FIELDS = ("name", "value", "domain", "path", "expires", "httpOnly", "secure", "sameSite")
+
+# Mismas señales que search_google.is_blocked; en la URL, solo host y ruta (la
+# búsqueda, location.search, puede contener "captcha")
+_BLOCKED_JS = f"""
+(function () {{
+    var url = (location.host + location.pathname).toLowerCase();
+    return {json.dumps(list(BLOCK_URL_MARKERS))}.some(function (marker) {{ return url.indexOf(marker) >= 0; }}) ||
+        !!document.querySelector({json.dumps(BLOCK_PAGE_SELECTOR)});
+}})()
+"""
+
+# Botón de cookies de Google: solo los selectores CSS/ID de COOKIE_SELECTORS
+_COOKIE_CSS = [f"#{value}" if kind == "id" else value
+               for kind, value in COOKIE_SELECTORS if kind in ("id", "css selector")]
+
+
+class CDPError(Exception):
+    """Error devuelto por el DevTools Protocol"""
+
+
+class CDPClient:
+    """Conexión websocket al navegador; `send` espera la respuesta de cada comando"""
+
+    def __init__(self, websocket):
+        self._ws = websocket
+        self._next_id = 0
+        self._pending = {}
+        self._reader = asyncio.create_task(self._read_loop())
+
+    @classmethod
+    async def connect(cls, ws_url):
+        return cls(await websockets.connect(ws_url, max_size=None))
+
+    async def send(self, method, params=None, session_id=None, timeout=30):
+        self._next_id += 1
+        message = {"id": self._next_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message["id"]] = future
+        try:
+            await self._ws.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            # Si se agota el tiempo la respuesta ya no interesa
+            self._pending.pop(message["id"], None)
+
+    async def evaluate(self, session_id, expression, timeout=30):
+        """Evalúa JavaScript en la pestaña y devuelve el valor ya convertido a Python"""
+        response = await self.send("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": True,
+            "awaitPromise": True,
+        }, session_id=session_id, timeout=timeout)
+        if "exceptionDetails" in response:
+            raise CDPError(response["exceptionDetails"].get("text", "Error de JavaScript"))
+        return response["result"].get("value")
+
+    async def close(self):
+        self._reader.cancel()
+        await self._ws.close()
+
+    async def _read_loop(self):
+        try:
+            async for raw in self._ws:
+                message = json.loads(raw)
+                future = self._pending.pop(message.get("id"), None)
+                if future is None or future.done():
+                    continue  # Eventos: no se usan, el estado se consulta con evaluate
+                if "error" in message:
+                    future.set_exception(CDPError(message["error"].get("message")))
+                else:
+                    future.set_result(message.get("result", {}))
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(CDPError("Conexión con el navegador cerrada"))
+
+
+def find_chrome_binary():
+    """Ruta del ejecutable de Chromium (CHROME_BINARY en .env o el primero del PATH)"""
+    configured = os.getenv("CHROME_BINARY")
+    if configured:
+        return configured
+    for name in CHROME_BINARIES:
+        path = shutil.which(name)
+        if path:
+            return path
+    raise FileNotFoundError("No se encontró Chromium/Chrome en el PATH (usa CHROME_BINARY)")
+
+
+class AsyncBrowser:
+    """Un Chromium lanzado con --remote-debugging-port y su conexión CDP"""
+
+    def __init__(self, headless=True):
+        self.headless = headless
+        self.process = None
+        self.cdp = None
+        self._profile_dir = None
+
+    async def start(self, startup_timeout=30):
+        self._profile_dir = tempfile.mkdtemp(prefix="scraper-cdp-")
+        # Mismas opciones que el scraper con Selenium; chromedriver antepone '--'
+        # a los argumentos que no lo llevan, aquí hay que hacerlo a mano
+        args = [a if a.startswith("-") else f"--{a}"
+                for a in build_chrome_options(self.headless).arguments]
+        args += ["--remote-debugging-port=0", f"--user-data-dir={self._profile_dir}", "about:blank"]
+        self.process = await asyncio.create_subprocess_exec(
+            find_chrome_binary(), *args,
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+        )
+        # Chromium escribe el puerto elegido en <perfil>/DevToolsActivePort
+        port_file = os.path.join(self._profile_dir, "DevToolsActivePort")
+        deadline = time.monotonic() + startup_timeout
+        while not os.path.exists(port_file) or os.path.getsize(port_file) == 0:
+            if time.monotonic() > deadline or self.process.returncode is not None:
+                await self.close()
+                raise CDPError("Chromium no abrió el puerto de DevTools")
+            await asyncio.sleep(0.05)
+        with open(port_file) as f:
+            port, path = f.read().split()[:2]
+        self.cdp = await CDPClient.connect(f"ws://127.0.0.1:{port}{path}")
+        return self
+
+    async def close(self):
+        if self.cdp:
+            try:
+                await self.cdp.send("Browser.close", timeout=5)
+            except Exception:
+                pass
+            await self.cdp.close()
+            self.cdp = None
+        if self.process and self.process.returncode is None:
+            self.process.kill()
+            await self.process.wait()
+        if self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+async def _wait_until(cdp, session_id, expression, timeout, poll):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if await cdp.evaluate(session_id, expression):
+                return True
+        except CDPError:
+            pass  # Navegación en curso: el contexto de ejecución aún no existe
+        await asyncio.sleep(poll)
+    return False
+
+
+async def _wait_loaded(cdp, session_id, search_engine):
+    """Espera a document.readyState === 'complete' (primera parte de readiness.wait_results_ready)"""
+    profile = get_profile(search_engine)
+    await _wait_until(cdp, session_id, "document.readyState === 'complete'",
+                      profile["ready_timeout"], profile["poll"])
+
+
+async def _wait_results_stable(cdp, session_id, search_engine):
+    """Espera a que el número de resultados deje de cambiar (segunda parte de readiness.wait_results_ready)"""
+    profile = get_profile(search_engine)
+    query = json.dumps(", ".join(selector for selector, _ in RESULT_SELECTORS[search_engine]))
+    last, stable = -1, 0
+    deadline = time.monotonic() + profile["results_timeout"]
+    while time.monotonic() < deadline:
+        try:
+            count = await cdp.evaluate(session_id, f"document.querySelectorAll({query}).length")
+        except CDPError:
+            count = 0
+        stable = stable + 1 if count and count == last else 0
+        last = count
+        if stable >= profile["stable_polls"]:
+            return True
+        await asyncio.sleep(profile["poll"])
+    return False
+
+
+async def _is_blocked(cdp, session_id, search_engine):
+    """True si la página es de bloqueo/CAPTCHA. Reintenta mientras la navegación destruye el contexto"""
+    profile = get_profile(search_engine)
+    deadline = time.monotonic() + profile["ready_timeout"]
+    while True:
+        try:
+            return bool(await cdp.evaluate(session_id, _BLOCKED_JS))
+        except CDPError:
+            if time.monotonic() >= deadline:
+                return False
+        await asyncio.sleep(profile["poll"])
+
+
+async def _wait_consent_closed(cdp, session_id, search_engine):
+    """Tras pulsar el botón de cookies, espera a que desaparezca y la página termine de cargar"""
+    profile = get_profile(search_engine)
+    # readyState sigue 'complete' en la página del diálogo hasta que llega la nueva:
+    # hay que esperar a que el botón ya no esté
+    await _wait_until(cdp, session_id,
+                      f"!document.querySelector({json.dumps(', '.join(_COOKIE_CSS))}) "
+                      "&& document.readyState === 'complete'",
+                      profile["ready_timeout"], profile["poll"])
+
+
+async def _accept_cookies(cdp, session_id):
+    """Pulsa el botón de cookies de Google si está en la página (solo selectores CSS/ID)"""
+    expression = f"""
+    (function () {{
+        for (const selector of {json.dumps(_COOKIE_CSS)}) {{
+            const button = document.querySelector(selector);
+            if (button) {{ button.click(); return true; }}
+        }}
+        return false;
+    }})()
+    """
+    return await cdp.evaluate(session_id, expression)
+
+
+async def search_one(browser, search_query, search_engine, max_pages=1):
+    """
+    Ejecuta una búsqueda en una pestaña nueva, aislada en su propio contexto
+
+    Returns:
+        Diccionario con el mismo formato que search_google_news (más 'engine'),
+        o None si la página estaba bloqueada o sin resultados
+    """
+    cdp = browser.cdp
+    context = await cdp.send("Target.createBrowserContext", {"disposeOnDetach": True})
+    context_id = context["browserContextId"]
+    try:
+        target = await cdp.send("Target.createTarget", {"url": "about:blank", "browserContextId": context_id})
+        attached = await cdp.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+        session_id = attached["sessionId"]
+        await cdp.send("Network.enable", session_id=session_id)
+        await cdp.send("Network.setBlockedURLs", {"urls": blocked_patterns(search_engine)},
+                       session_id=session_id)
+        # Cookies de consentimiento guardadas: el diálogo no vuelve a aparecer
+        consent = load_cookie_jar(search_engine)
+        if consent:
+            await cdp.send("Storage.setCookies", {"cookies": consent, "browserContextId": context_id})
+
+        strategy = get_strategy()
+        config = json.dumps({
+            "container": strategy.order(search_engine, "container", CONTAINER_SELECTORS[search_engine],
+                                        pinned=CATCH_ALL_SELECTORS),
+            "results": [selector for selector, _ in strategy.order(
+                search_engine, "results", RESULT_SELECTORS[search_engine], key=lambda s: s[0],
+                pinned=CATCH_ALL_SELECTORS)],
+            "title": [list(s) for s in strategy.order(search_engine, "title", TITLE_SELECTORS[search_engine],
+                                                      pinned=CATCH_ALL_SELECTORS)],
+            "snippet": [list(s) for s in strategy.order(search_engine, "snippet", SNIPPET_SELECTORS[search_engine],
+                                                        pinned=CATCH_ALL_SELECTORS)],
+            "min_text": 10,
+            "limit": None,
+        })
+        extract_expression = f"(function () {{ {EXTRACT_JS} }}).apply(null, [{config}])"
+
+        timestamp = datetime.now().isoformat()
+        ranked = []
+        for page in range(1, max_pages + 1):
+            await cdp.send("Page.navigate", {"url": build_search_url(search_query, search_engine, page)},
+                           session_id=session_id)
+            await _wait_loaded(cdp, session_id, search_engine)
+            # Diálogo de cookies y página de bloqueo antes de esperar resultados: en
+            # ellas el número de resultados nunca se estabiliza y se agotaría la espera
+            if search_engine == "google" and page == 1 and not consent and await _accept_cookies(cdp, session_id):
+                await _wait_consent_closed(cdp, session_id, search_engine)
+                cookies = await cdp.send("Storage.getCookies", {"browserContextId": context_id})
+                save_cookie_jar(search_engine, [{k: c[k] for k in _COOKIE_FIELDS if k in c}
+                                                for c in cookies.get("cookies", [])])
+            if await _is_blocked(cdp, session_id, search_engine):
+                log_warning("[%s] Página de bloqueo para '%s'", search_engine, search_query)
+                break
+            await _wait_results_stable(cdp, session_id, search_engine)
+            extraction = await cdp.evaluate(session_id, extract_expression)
+            strategy.record_extraction(search_engine, extraction, CATCH_ALL_SELECTORS)
+            if not extraction["results"]:
+                break
+            for raw in extraction["results"]:
+                ranked.append({"rank": len(ranked) + 1, "page": page, **normalize_result(raw)})
+    finally:
+        try:
+            await cdp.send("Target.disposeBrowserContext", {"browserContextId": context_id})
+        except CDPError:
+            pass
+
+    if not ranked:
+        return None
+    first = ranked[0]
+    return {
+        "timestamp": timestamp,
+        "search_query": search_query,
+        "engine": search_engine,
+        "result": {"title": first["title"], "url": first["url"], "snippet": first["snippet"]},
+        "results": ranked,
+    }
+
+
+def _engine_limits():
+    limits = dict(DEFAULT_ENGINE_LIMITS)
+    for item in filter(None, os.getenv("ENGINE_CONCURRENCY", "").split(",")):
+        engine, _, value = item.partition("=")
+        limits[engine.strip().lower()] = int(value)
+    return limits
+
+
+async def search_many(queries, engines=None, concurrency=None, engine_limits=None,
+                      headless=None, max_pages=None, sink=None, job_timeout=60):
+    """
+    Ejecuta muchas búsquedas a la vez sobre un único Chromium
+
+    Args:
+        queries: Iterable de búsquedas (puede ser un generador: se consume a medida
+            que hay pestañas libres)
+        engines: Lista de buscadores; cada búsqueda se lanza en todos. Si None, SEARCH_ENGINE
+        concurrency: Pestañas simultáneas en total. Si None, lee ASYNC_CONCURRENCY (4)
+        engine_limits: {buscador: pestañas simultáneas}. Si None, ENGINE_CONCURRENCY
+        headless: Si None, lee HEADLESS del .env
+        max_pages: Si None, lee MAX_PAGES del .env
+        sink: ResultWriter (o JsonlSink) donde añadir cada resultado en cuanto se obtiene (opcional)
+        job_timeout: Segundos máximos por búsqueda
+
+    Returns:
+        Lista de resultados (None si falló) en el orden de (búsqueda, buscador)
+    """
+    if engines is None:
+        engines = [os.getenv("SEARCH_ENGINE", "bing").lower()]
+    if concurrency is None:
+        concurrency = int(os.getenv("ASYNC_CONCURRENCY", "4"))
+    if engine_limits is None:
+        engine_limits = _engine_limits()
+    if headless is None:
+        headless = os.getenv("HEADLESS", "true").lower() == "true"
+    if max_pages is None:
+        max_pages = int(os.getenv("MAX_PAGES", "1"))
+
+    semaphores = {engine: asyncio.Semaphore(engine_limits.get(engine, concurrency)) for engine in engines}
+    # Cola acotada: el productor espera si los trabajadores van por detrás
+    jobs = asyncio.Queue(maxsize=concurrency * 2)
+    results = {}
+
+    async def _producer():
+        index = 0
+        for query in queries:
+            for engine in engines:
+                await jobs.put((index, query, engine))
+                index += 1
+        for _ in range(concurrency):
+            await jobs.put(None)
+
+    async def _worker(browser):
+        while True:
+            job = await jobs.get()
+            if job is None:
+                return
+            index, query, engine = job
+            async with semaphores[engine]:
+                start = time.monotonic()
+                try:
+                    result = await asyncio.wait_for(search_one(browser, query, engine, max_pages), job_timeout)
+                except Exception as e:
+                    log_error("[%s] Fallo en '%s': %s: %s", engine, query, type(e).__name__, e)
+                    result = None
+            results[index] = result
+            if result:
+                log_success("[%s] '%s': %d resultados en %.1fs", engine, query, len(result["results"]),
+                            time.monotonic() - start)
+                if sink:
+                    for item in result["results"]:
+                        sink.write({"timestamp": result["timestamp"], "search_query": query,
+                                    "engine": engine, **item})
+
+    start = time.monotonic()
+    async with AsyncBrowser(headless) as browser:
+        await asyncio.gather(_producer(), *(_worker(browser) for _ in range(concurrency)))
+    elapsed = time.monotonic() - start
+
+    ordered = [results[i] for i in sorted(results)]
+    ok = sum(1 for r in ordered if r)
+    rate = len(ordered) / elapsed * 60 if elapsed > 0 else 0.0
+    log_success("Modo asíncrono: %d/%d correctas en %.1fs (%.1f búsquedas/minuto, %d pestañas, 1 navegador)",
+                ok, len(ordered), elapsed, rate, concurrency)
+    return ordered
+
+
+def main(argv):
+    engines, concurrency, paths = None, None, []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--engines":
+            engines = [e.strip().lower() for e in next(args, "").split(",") if e.strip()]
+        elif arg == "--concurrency":
+            concurrency = int(next(args, "4"))
+        else:
+            paths.append(arg)
+    if not paths:
+        print(__doc__)
+        return 1
+
+    queries = [q for path in paths for q in load_queries(path)]
+    log_info("Modo asíncrono: %d búsquedas", len(queries))
+    with ResultWriter.from_env() as sink:
+        resultados = asyncio.run(search_many(queries, engines=engines, concurrency=concurrency, sink=sink))
+    log_success("%d resultados añadidos a: %s", sink.count, sink.path)
+    return 0 if any(resultados) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,307 @@
+"""
+Benchmark del scraper contra páginas de resultados grabadas (sin red)
+
+Arranca replay_server.py, apunta GOOGLE_BASE_URL/BING_BASE_URL a él y ejecuta
+las mismas búsquedas con cada modo de ejecución. Para cada modo informa de las
+búsquedas por segundo, la latencia p50/p95 de cada fase (de metrics.py) y la
+memoria de los navegadores (PSS de chromedriver + Chromium, o RSS si no hay PSS).
+
+Modos:
+    single  Un navegador nuevo por búsqueda (el comportamiento original)
+    batch   Pool de navegadores reutilizados (--batch)
+    html    Como batch, con EXTRACTION_MODE=html
+    form    Como batch, con NAVIGATION_MODE=form
+    dense   Como batch, con LAUNCH_PROFILE=dense (Chromium de bajo consumo)
+    async   Un solo Chromium con una pestaña por búsqueda (async_search.py)
+
+En batch/html/form el pool se arranca antes de empezar a medir; en single y
+async el arranque del navegador forma parte del tiempo medido.
+
+Uso:
+    python benchmark.py [--modes single,batch,html,form,dense,async] [--queries 20]
+                        [--engine bing|google] [--pool-size 2] [--latency 0]
+                        [--blocked 0.1] [--output output/benchmark.json]
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from browser_memory import child_processes_memory
+from logging_setup import ContextFilter, JsonFormatter
+from replay_server import ReplayServer
+
+MODES = {
+    "single": "Un navegador nuevo por búsqueda",
+    "batch": "Pool de navegadores reutilizados",
+    "html": "Pool + EXTRACTION_MODE=html",
+    "form": "Pool + NAVIGATION_MODE=form",
+    "dense": "Pool + LAUNCH_PROFILE=dense",
+    "async": "Un Chromium, una pestaña por búsqueda",
+}
+
+# Variables de entorno de cada modo (el resto usa la configuración por defecto)
+MODE_ENV = {
+    "html": {"EXTRACTION_MODE": "html"},
+    "form": {"NAVIGATION_MODE": "form"},
+    "dense": {"LAUNCH_PROFILE": "dense"},
+}
+
+
+def percentile(values, pct):
+    """Percentil por el método del rango más cercano (None si no hay valores)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class MemorySampler:
+    """Mide periódicamente la memoria de los navegadores en un hilo aparte"""
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            value = child_processes_memory()
+            if value is None:
+                return
+            self.samples.append(value)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self):
+        if not self.samples:
+            return {"peak_mb": None, "mean_mb": None}
+        return {
+            "peak_mb": round(max(self.samples), 1),
+            "mean_mb": round(sum(self.samples) / len(self.samples), 1),
+        }
+
+
+def build_queries(count, blocked_ratio=0.0):
+    """Búsquedas del benchmark; una fracción `blocked_ratio` recibe la página de bloqueo"""
+    every = round(1 / blocked_ratio) if blocked_ratio > 0 else 0
+    return [f"captcha {i:03d}" if every and i % every == every - 1 else f"Noticias {i:03d}"
+            for i in range(count)]
+
+
+# Cada runner devuelve (resultados, fases extra medidas aquí, segundos medidos)
+def _run_single(sg, queries, engine, pool_size, sink):
+    results, startup_ms = [], []
+    began = time.monotonic()
+    for query in queries:
+        start = time.monotonic()
+        driver = sg.create_driver(True)
+        startup_ms.append((time.monotonic() - start) * 1000)
+        try:
+            results.append(sg.search_google_news(query, search_engine=engine, driver=driver,
+                                                 sink=sink, use_cache=False))
+        finally:
+            driver.quit()
+    return results, {"driver_startup": startup_ms}, time.monotonic() - began
+
+
+def _run_pool(sg, queries, engine, pool_size, sink):
+    from driver_pool import DriverPool
+
+    with DriverPool(lambda: sg.create_driver(True), pool_size, max_uses=0) as pool:
+        start = time.monotonic()
+        pool.warm()
+        warm_ms = (time.monotonic() - start) * 1000
+
+        def _one(query):
+            with pool.driver() as driver:
+                return sg.search_google_news(query, search_engine=engine, driver=driver,
+                                             sink=sink, use_cache=False)
+
+        # El arranque del pool no cuenta en el tiempo del modo
+        began = time.monotonic()
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            results = list(executor.map(_one, queries))
+        elapsed = time.monotonic() - began
+    return results, {"pool_warmup": [warm_ms]}, elapsed
+
+
+def _run_async(sg, queries, engine, pool_size, sink):
+    from async_search import search_many
+
+    began = time.monotonic()
+    results = asyncio.run(search_many(queries, engines=[engine], concurrency=pool_size,
+                                      headless=True, sink=sink))
+    return results, {}, time.monotonic() - began
+
+
+RUNNERS = {"single": _run_single, "batch": _run_pool, "html": _run_pool, "form": _run_pool,
+           "dense": _run_pool, "async": _run_async}
+
+
+def run_mode(sg, mode, queries, engine, pool_size, workdir, server):
+    """Ejecuta las búsquedas con un modo y devuelve su informe"""
+    from jsonl_sink import JsonlSink
+
+    metrics_path = os.path.join(workdir, f"metrics_{mode}.jsonl")
+    # Sin descarga HTTP previa: se mide siempre el navegador
+    env = {"METRICS_PATH": metrics_path, "EXTRACTION_MODE": "js", "NAVIGATION_MODE": "direct",
+           "HTTP_FAST_PATH": "", "LAUNCH_PROFILE": "standard", **MODE_ENV.get(mode, {})}
+    os.environ.update(env)
+    requests_before = server.requests
+
+    # Los avisos y errores del modo van a su propio archivo (además de a la consola)
+    log_path = os.path.join(workdir, f"{mode}.log")
+    log_handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+    log_handler.setFormatter(JsonFormatter())
+    log_handler.addFilter(ContextFilter())
+    logging.getLogger().addHandler(log_handler)
+    try:
+        with contextlib.redirect_stdout(log_handler.stream), \
+                JsonlSink(os.path.join(workdir, f"results_{mode}.jsonl")) as sink, MemorySampler() as memory:
+            results, extra_phases, elapsed = RUNNERS[mode](sg, queries, engine, pool_size, sink)
+    finally:
+        logging.getLogger().removeHandler(log_handler)
+        log_handler.close()
+
+    phases = defaultdict(list)
+    for name, values in extra_phases.items():
+        phases[name].extend(values)
+    statuses = defaultdict(int)
+    if os.path.exists(metrics_path):
+        with open(metrics_path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                statuses[record["status"]] += 1
+                phases["total"].append(record["total_ms"])
+                for name, ms in record["phases"].items():
+                    phases[name].append(ms)
+
+    ok = sum(1 for result in results if result)
+    return {
+        "mode": mode,
+        "description": MODES[mode],
+        "queries": len(queries),
+        "ok": ok,
+        "statuses": dict(statuses),
+        "elapsed_s": round(elapsed, 2),
+        "qps": round(len(queries) / elapsed, 3) if elapsed > 0 else None,
+        "phases": {
+            name: {"p50_ms": round(percentile(values, 50), 1), "p95_ms": round(percentile(values, 95), 1),
+                   "n": len(values)}
+            for name, values in sorted(phases.items())
+        },
+        "memory": memory.summary(),
+        "server_requests": server.requests - requests_before,
+        "log": log_path,
+    }
+
+
+def print_report(reports):
+    def _fmt(value, suffix=""):
+        return "-" if value is None else f"{value:.1f}{suffix}"
+
+    print(f"\n{'='*78}")
+    print(f"{'Modo':<8} {'Correctas':>10} {'Búsq/s':>8} {'p50 total':>10} {'p95 total':>10} "
+          f"{'Mem. pico':>11} {'Mem. media':>11}")
+    print(f"{'-'*78}")
+    for report in reports:
+        total = report["phases"].get("total", {})
+        print(f"{report['mode']:<8} {report['ok']:>5}/{report['queries']:<4} {report['qps']:>8.2f} "
+              f"{_fmt(total.get('p50_ms'), 'ms'):>10} {_fmt(total.get('p95_ms'), 'ms'):>10} "
+              f"{_fmt(report['memory']['peak_mb'], 'MB'):>11} {_fmt(report['memory']['mean_mb'], 'MB'):>11}")
+    print(f"{'='*78}")
+    for report in reports:
+        if not report["phases"]:
+            continue
+        print(f"\n{report['mode']} - {report['description']} (p50 / p95 por fase)")
+        for name, stats in report["phases"].items():
+            print(f"  {name:<22} {stats['p50_ms']:>9.1f} ms {stats['p95_ms']:>9.1f} ms   (n={stats['n']})")
+    print()
+
+
+def main(argv):
+    modes, count, engine, pool_size = ["single", "batch", "dense", "html", "async"], 20, "bing", 2
+    latency, blocked, output = 0.0, 0.0, "output/benchmark.json"
+    args = iter(argv)
+    for arg in args:
+        if arg == "--modes":
+            modes = [m.strip() for m in next(args, "").split(",") if m.strip()]
+        elif arg == "--queries":
+            count = int(next(args, "20"))
+        elif arg == "--engine":
+            engine = next(args, "bing").lower()
+        elif arg == "--pool-size":
+            pool_size = int(next(args, "2"))
+        elif arg == "--latency":
+            latency = float(next(args, "0"))
+        elif arg == "--blocked":
+            blocked = float(next(args, "0"))
+        elif arg == "--output":
+            output = next(args, output)
+        else:
+            print(__doc__)
+            return 1
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        print(f"Modos desconocidos: {', '.join(unknown)} (disponibles: {', '.join(MODES)})")
+        return 1
+
+    workdir = tempfile.mkdtemp(prefix="benchmark_")
+    server = ReplayServer(latency=latency)
+    server.start()
+    # Configurar antes de importar el scraper: ENGINE_URLS se lee al importarlo
+    os.environ.update({
+        "GOOGLE_BASE_URL": server.base_urls()["google"],
+        "BING_BASE_URL": server.base_urls()["bing"],
+        "HEADLESS": "true",
+        "CACHE_ENABLED": "false",
+        "METRICS_ENABLED": "true",
+        "METRICS_PROM_PATH": "",
+        "RESOURCE_STATS": "false",
+        "SELECTOR_STATS_PATH": os.path.join(workdir, "selector_stats.json"),
+        "PROFILE_DIR": os.path.join(workdir, "profiles"),
+        "LOG_LEVEL": "WARNING",
+    })
+    import search_google as sg
+
+    queries = build_queries(count, blocked)
+    print(f"Benchmark: {count} búsquedas en {engine.upper()}, modos {', '.join(modes)}, "
+          f"{pool_size} navegadores/pestañas, servidor {server.url} (latencia {latency:.0f} ms)")
+    print(f"Logs y métricas de cada modo en: {workdir}")
+    reports = []
+    try:
+        for mode in modes:
+            print(f"  → {mode}: {MODES[mode]}...", flush=True)
+            reports.append(run_mode(sg, mode, queries, engine, pool_size, workdir, server))
+    finally:
+        server.stop()
+
+    print_report(reports)
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"engine": engine, "queries": count, "pool_size": pool_size, "latency_ms": latency,
+                   "blocked_ratio": blocked, "modes": reports}, f, ensure_ascii=False, indent=2)
+    print(f"Informe guardado en: {output}")
+    return 0 if all(report["ok"] for report in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
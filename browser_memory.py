@@ -0,0 +1,142 @@
+"""
+Perfil de arranque "dense" de Chromium y medición de memoria de los navegadores
+
+Con LAUNCH_PROFILE=dense el navegador se abre pensando en meter muchos workers
+en la misma máquina: ventana pequeña fija, un solo proceso de renderizado,
+caché de disco limitada, heap de JavaScript acotado y sin extensiones ni
+servicios en segundo plano. La memoria de cada navegador (chromedriver, Chromium
+y todos sus procesos hijos) se mide con /proc: PSS si está disponible (reparte
+la memoria compartida entre procesos), si no RSS.
+
+DriverPool usa `driver_memory_mb` para reciclar los navegadores que superan
+DRIVER_MAX_MEMORY_MB (ver `pool_memory_options`).
+"""
+import logging
+import os
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+LAUNCH_PROFILES = ("standard", "dense")
+
+# Argumentos fijos del perfil dense
+DENSE_ARGS = [
+    "--renderer-process-limit=1",
+    "--disable-site-isolation-trials",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-breakpad",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,BackForwardCache,AutofillServerCommunication",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--metrics-recording-only",
+    "--mute-audio",
+]
+
+# Por debajo de este tamaño /dev/shm no basta para Chromium (Docker da 64 MB por defecto)
+MIN_SHM_MB = 512
+
+
+def launch_profile():
+    """Perfil de arranque configurado en .env (LAUNCH_PROFILE, por defecto 'standard')"""
+    name = os.getenv("LAUNCH_PROFILE", "standard").lower()
+    if name not in LAUNCH_PROFILES:
+        raise ValueError(f"Perfil de arranque desconocido: {name} (disponibles: {', '.join(LAUNCH_PROFILES)})")
+    return name
+
+
+def shm_size_mb(path="/dev/shm"):
+    """Tamaño de /dev/shm en MB (0 si no existe)"""
+    try:
+        stat = os.statvfs(path)
+    except OSError:
+        return 0
+    return stat.f_blocks * stat.f_frsize / (1024 * 1024)
+
+
+def dense_arguments():
+    """Argumentos de Chromium del perfil dense, con los límites de .env"""
+    width, height = os.getenv("DENSE_WINDOW_SIZE", "1280,800").split(",")
+    return DENSE_ARGS + [
+        f"--window-size={int(width)},{int(height)}",
+        f"--disk-cache-size={int(os.getenv('DENSE_DISK_CACHE_MB', '16')) * 1024 * 1024}",
+        f"--js-flags=--max-old-space-size={int(os.getenv('DENSE_JS_HEAP_MB', '128'))}",
+    ]
+
+
+def process_memory_kb(pid):
+    """PSS de un proceso en KB (reparte la memoria compartida), o RSS si no está disponible"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _children_by_parent():
+    """{pid padre: [pids hijos]} de todos los procesos, o None si no hay /proc"""
+    children = defaultdict(list)
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children[ppid].append(int(entry))
+    return children
+
+
+def process_tree_memory_mb(root_pid, include_root=True):
+    """MB de memoria de un proceso y todos sus descendientes. None si no hay /proc"""
+    children = _children_by_parent()
+    if children is None:
+        return None
+    total_kb = process_memory_kb(root_pid) if include_root else 0
+    pending = list(children[root_pid])
+    while pending:
+        pid = pending.pop()
+        pending.extend(children[pid])
+        total_kb += process_memory_kb(pid)
+    return total_kb / 1024
+
+
+def child_processes_memory(root_pid=None):
+    """MB de memoria de todos los procesos descendientes (chromedriver, Chromium...). None si no hay /proc"""
+    return process_tree_memory_mb(root_pid or os.getpid(), include_root=False)
+
+
+def driver_memory_mb(driver):
+    """MB de memoria de un navegador (chromedriver + Chromium y sus procesos). None si no se puede medir"""
+    try:
+        pid = driver.service.process.pid
+    except AttributeError:
+        return None
+    return process_tree_memory_mb(pid)
+
+
+def pool_memory_options():
+    """Opciones de memoria de DriverPool configuradas en .env"""
+    return {
+        "max_memory_mb": float(os.getenv("DRIVER_MAX_MEMORY_MB", "0")),
+        "memory_check_every": int(os.getenv("MEMORY_CHECK_EVERY", "10")),
+        "measure": driver_memory_mb,
+    }
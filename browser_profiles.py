@@ -0,0 +1,243 @@
+"""
+Perfiles persistentes de Chrome para no repetir el diálogo de cookies en cada búsqueda
+
+Cada navegador se abre con `--user-data-dir` apuntando a un perfil de
+PROFILE_DIR (output/profiles/profile-N): las cookies de consentimiento se
+guardan en el perfil y la siguiente búsqueda ya no ve el diálogo. Un perfil solo
+lo usa un navegador a la vez (bloqueo con flock, válido entre procesos y
+contenedores que compartan la carpeta); se reparten por turnos, empezando por
+el que lleva más tiempo sin usarse. Si un buscador nos bloquea con un perfil, el
+perfil se marca y se borra al cerrar el navegador, así el siguiente empieza limpio.
+
+Para async_search.py (contextos efímeros, sin perfil en disco) se guarda además
+un archivo de cookies de consentimiento por buscador que se inyecta en cada contexto.
+"""
+import fcntl
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from selenium import webdriver
+
+logger = logging.getLogger(__name__)
+
+# Cookies que indican que ya se aceptó el diálogo de consentimiento: (nombre, prefijo del valor)
+CONSENT_COOKIES = {
+    "google": [("SOCS", ""), ("CONSENT", "YES")],
+}
+
+_METADATA_FILE = "scraper_profile.json"
+_LOCK_FILE = ".scraper.lock"
+# Archivos que deja Chrome si se cerró mal; con ellos se niega a abrir el perfil
+_STALE_FILES = ("SingletonLock", "SingletonCookie", "SingletonSocket")
+
+
+def has_consent_cookie(cookies, search_engine):
+    """True si `cookies` (lista de dicts con name/value) incluye una cookie de consentimiento válida"""
+    expected = CONSENT_COOKIES.get(search_engine)
+    if not expected:
+        return False
+    now = time.time()
+    for cookie in cookies:
+        expiry = cookie.get("expiry", cookie.get("expires", -1))
+        if expiry not in (None, -1) and 0 < expiry < now:
+            continue
+        for name, prefix in expected:
+            if cookie.get("name") == name and str(cookie.get("value", "")).startswith(prefix):
+                return True
+    return False
+
+
+class Profile:
+    """Perfil de Chrome prestado por un ProfilePool"""
+
+    def __init__(self, pool, path, lock_file, temporary=False):
+        self.pool = pool
+        self.path = path
+        self.flagged = False
+        self.temporary = temporary
+        self._lock_file = lock_file
+        self._released = False
+
+    def flag(self, reason):
+        """Marca el perfil para borrarlo al devolverlo (p. ej. tras un CAPTCHA)"""
+        if not self.flagged:
+            logger.warning("Perfil %s marcado (%s): se reiniciará al cerrar", os.path.basename(self.path), reason)
+        self.flagged = True
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.pool.release(self)
+
+
+class ProfilePool:
+    """
+    Args:
+        root: Carpeta donde viven los perfiles
+        size: Número máximo de perfiles persistentes; si todos están en uso se
+            usa un perfil temporal (sin persistencia)
+        max_uses: Aperturas del navegador tras las que un perfil se reinicia (0 = sin límite)
+    """
+
+    def __init__(self, root, size=4, max_uses=500):
+        self.root = root
+        self.size = size
+        self.max_uses = max_uses
+        self.resets = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """Crea el pool configurado en .env (por defecto, tantos perfiles como navegadores y al menos 4)"""
+        size = int(os.getenv("PROFILE_POOL_SIZE", "0"))
+        if not size:
+            size = max(4, int(os.getenv("POOL_SIZE", "0")) or os.cpu_count() or 1)
+        return cls(
+            os.getenv("PROFILE_DIR", "output/profiles"),
+            size=size,
+            max_uses=int(os.getenv("PROFILE_MAX_USES", "500")),
+        )
+
+    def _metadata(self, path):
+        try:
+            with open(os.path.join(path, _METADATA_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"uses": 0, "last_used": 0, "created": time.time()}
+
+    def _write_metadata(self, path, data):
+        with open(os.path.join(path, _METADATA_FILE), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def acquire(self):
+        """Presta el perfil libre usado hace más tiempo (o uno temporal si no hay libres)"""
+        with self._lock:
+            paths = [os.path.join(self.root, f"profile-{i}") for i in range(self.size)]
+            for path in sorted(paths, key=lambda p: self._metadata(p)["last_used"]):
+                os.makedirs(path, exist_ok=True)
+                lock_file = open(os.path.join(path, _LOCK_FILE), "a")
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    lock_file.close()
+                    continue  # En uso por otro navegador (de este u otro proceso)
+                metadata = self._metadata(path)
+                if self.max_uses and metadata["uses"] >= self.max_uses:
+                    self._reset(path, f"{metadata['uses']} usos")
+                    metadata = self._metadata(path)
+                for name in _STALE_FILES:
+                    try:
+                        os.unlink(os.path.join(path, name))
+                    except OSError:
+                        pass
+                metadata["uses"] += 1
+                metadata["last_used"] = time.time()
+                self._write_metadata(path, metadata)
+                return Profile(self, path, lock_file)
+        path = tempfile.mkdtemp(prefix="scraper-profile-")
+        logger.warning("Los %d perfiles están en uso: usando un perfil temporal", self.size)
+        return Profile(self, path, None, temporary=True)
+
+    def release(self, profile):
+        """Devuelve un perfil; si estaba marcado se borra su contenido"""
+        if profile.temporary:
+            shutil.rmtree(profile.path, ignore_errors=True)
+            return
+        try:
+            if profile.flagged:
+                self._reset(profile.path, "marcado por bloqueo")
+        finally:
+            fcntl.flock(profile._lock_file, fcntl.LOCK_UN)
+            profile._lock_file.close()
+
+    def _reset(self, path, reason):
+        """Vacía el perfil (conserva el archivo de bloqueo, que está abierto)"""
+        for name in os.listdir(path):
+            if name == _LOCK_FILE:
+                continue
+            target = os.path.join(path, name)
+            if os.path.isdir(target) and not os.path.islink(target):
+                shutil.rmtree(target, ignore_errors=True)
+            else:
+                try:
+                    os.unlink(target)
+                except OSError:
+                    pass
+        self._write_metadata(path, {"uses": 0, "last_used": time.time(), "created": time.time()})
+        self.resets += 1
+        logger.info("Perfil %s reiniciado (%s)", os.path.basename(path), reason)
+
+
+class ProfiledChrome(webdriver.Chrome):
+    """Chrome abierto con un perfil del ProfilePool; lo devuelve al cerrarse"""
+
+    def __init__(self, profile, options, **kwargs):
+        self.profile = profile
+        options.add_argument(f"--user-data-dir={os.path.abspath(profile.path)}")
+        super().__init__(options=options, **kwargs)
+
+    @property
+    def flagged(self):
+        return self.profile.flagged
+
+    def quit(self):
+        try:
+            super().quit()
+        finally:
+            self.profile.release()
+
+
+def flag_driver(driver, reason):
+    """Marca el perfil del navegador (si tiene) para reiniciarlo. True si tenía perfil"""
+    profile = getattr(driver, "profile", None)
+    if isinstance(profile, Profile):
+        profile.flag(reason)
+        return True
+    return False
+
+
+def load_cookie_jar(search_engine):
+    """Cookies de consentimiento guardadas para `search_engine` (lista vacía si no hay)"""
+    path = os.path.join(os.getenv("PROFILE_DIR", "output/profiles"), f"cookies_{search_engine}.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            cookies = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return cookies if has_consent_cookie(cookies, search_engine) else []
+
+
+def save_cookie_jar(search_engine, cookies):
+    """Guarda (de forma atómica) las cookies de consentimiento de `search_engine`"""
+    names = {name for name, _ in CONSENT_COOKIES.get(search_engine, [])}
+    keep = [c for c in cookies if c.get("name") in names]
+    if not keep:
+        return
+    root = os.getenv("PROFILE_DIR", "output/profiles")
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, f"cookies_{search_engine}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(keep, f)
+    os.replace(tmp_path, path)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_profile_pool():
+    """Pool de perfiles compartido por el proceso, o None si PROFILES_ENABLED=false"""
+    global _shared
+    if os.getenv("PROFILES_ENABLED", "true").lower() != "true":
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = ProfilePool.from_env()
+        return _shared
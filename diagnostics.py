@@ -0,0 +1,249 @@
+"""
+Capturas de diagnóstico de las búsquedas fallidas (HTML y, opcionalmente, screenshot)
+
+Sustituye a los debug_*.png / debug_page_source.html que se sobrescribían en la
+carpeta actual. Cada captura se guarda en DEBUG_DIR (output/debug/):
+
+    html/<ab>/<sha256>.html.gz   HTML comprimido, con su hash como nombre: la
+                                 misma página de bloqueo se guarda una sola vez
+    png/<ab>/<sha256>.png        Screenshot (solo con DEBUG_SCREENSHOTS=true)
+    captures.jsonl               Una línea por captura: motivo, buscador,
+                                 búsqueda, URL y archivos
+
+Solo se captura una fracción de los fallos (DEBUG_SAMPLE_RATE). El hilo de la
+búsqueda únicamente pide el HTML (y la imagen) al navegador; comprimir y escribir
+se hace en un hilo aparte. Si la carpeta pasa de DEBUG_MAX_MB se borran las
+capturas más antiguas.
+"""
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from datetime import datetime
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "captures.jsonl"
+# Al superar la cuota se borra hasta quedar por debajo de esta fracción
+PRUNE_TARGET = 0.9
+
+_STOP = object()
+
+
+class Diagnostics:
+    """
+    Args:
+        root: Carpeta de las capturas
+        sample_rate: Fracción de fallos que se capturan (0 a 1)
+        screenshots: Si True, guarda también un screenshot PNG
+        max_bytes: Tamaño máximo de la carpeta (0 = sin límite)
+        queue_size: Capturas pendientes de escribir; si se llena, las nuevas se descartan
+    """
+
+    def __init__(self, root="output/debug", sample_rate=1.0, screenshots=False, max_bytes=0, queue_size=32):
+        self.root = root
+        self.sample_rate = sample_rate
+        self.screenshots = screenshots
+        self.max_bytes = max_bytes
+        self.captured = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.pruned = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._size = self._disk_usage()
+        self._thread = threading.Thread(target=self._run, name="diagnostics", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            os.getenv("DEBUG_DIR", "output/debug"),
+            sample_rate=float(os.getenv("DEBUG_SAMPLE_RATE", "1")),
+            screenshots=os.getenv("DEBUG_SCREENSHOTS", "false").lower() == "true",
+            max_bytes=int(float(os.getenv("DEBUG_MAX_MB", "200")) * 1024 * 1024),
+        )
+
+    def sampled(self):
+        """Decide si se captura este fallo"""
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def capture(self, driver, reason, engine=None, query=None):
+        """Captura la página actual del navegador si el fallo sale en la muestra. True si se encoló"""
+        if not self.sampled():
+            return False
+        try:
+            url, page_html = driver.current_url, driver.page_source
+            screenshot = driver.get_screenshot_as_png() if self.screenshots else None
+        except Exception as e:
+            logger.warning("No se pudo capturar la página para diagnóstico: %s", e)
+            return False
+        return self._enqueue(page_html, url, reason, engine, query, screenshot)
+
+    def capture_html(self, page_html, url, reason, engine=None, query=None):
+        """Como capture(), con un HTML ya descargado (p. ej. por HTTP, sin navegador)"""
+        if not self.sampled():
+            return False
+        return self._enqueue(page_html, url, reason, engine, query, None)
+
+    def _enqueue(self, page_html, url, reason, engine, query, screenshot):
+        current = metrics.current()
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "reason": reason,
+            "engine": engine,
+            "query": query,
+            "query_id": current.id if current else None,
+            "url": url,
+        }
+        try:
+            self._queue.put_nowait((entry, page_html, screenshot))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            logger.debug("Cola de diagnóstico llena, captura descartada")
+            return False
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            try:
+                self._write(*item)
+            except Exception as e:
+                logger.warning("No se pudo guardar la captura de diagnóstico: %s", e)
+
+    def _store(self, folder, data, extension, compress=False):
+        """Guarda `data` con su hash como nombre. Devuelve (ruta relativa, bytes nuevos)"""
+        digest = hashlib.sha256(data).hexdigest()
+        relative = os.path.join(folder, digest[:2], f"{digest}{extension}")
+        path = os.path.join(self.root, relative)
+        if os.path.exists(path):
+            os.utime(path)  # Ya guardada: cuenta como reciente para la poda
+            return relative, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = gzip.compress(data, compresslevel=6) if compress else data
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return relative, len(payload)
+
+    def _write(self, entry, page_html, screenshot):
+        entry["html"], added = self._store("html", page_html.encode("utf-8"), ".html.gz", compress=True)
+        deduplicated = added == 0
+        if screenshot:
+            entry["screenshot"], png_bytes = self._store("png", screenshot, ".png")
+            added += png_bytes
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with open(os.path.join(self.root, INDEX_FILE), "a", encoding="utf-8") as f:
+            f.write(line)
+        with self._lock:
+            self.captured += 1
+            self.deduplicated += deduplicated
+            self._size += added + len(line.encode("utf-8"))
+            over_quota = self.max_bytes and self._size > self.max_bytes
+        logger.info("Captura de diagnóstico (%s): %s%s", entry["reason"], os.path.join(self.root, entry["html"]),
+                    " (ya guardada)" if deduplicated else "")
+        if over_quota:
+            self._prune()
+
+    def _blobs(self):
+        """(mtime, tamaño, ruta) de cada captura guardada"""
+        blobs = []
+        for folder in ("html", "png"):
+            for directory, _, names in os.walk(os.path.join(self.root, folder)):
+                for name in names:
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    blobs.append((stat.st_mtime, stat.st_size, path))
+        return blobs
+
+    def _disk_usage(self):
+        total = sum(size for _, size, _ in self._blobs())
+        try:
+            total += os.path.getsize(os.path.join(self.root, INDEX_FILE))
+        except OSError:
+            pass
+        return total
+
+    def _prune(self):
+        """Borra las capturas más antiguas hasta quedar por debajo de la cuota"""
+        size = self._disk_usage()
+        target = self.max_bytes * PRUNE_TARGET
+        removed = 0
+        for _, blob_size, path in sorted(self._blobs()):
+            if size <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            size -= blob_size
+            removed += 1
+        if removed:
+            size += self._compact_index()
+        with self._lock:
+            self._size = size
+            self.pruned += removed
+        if removed:
+            logger.info("Diagnóstico: %d capturas antiguas borradas (cuota de %.0f MB)",
+                        removed, self.max_bytes / (1024 * 1024))
+
+    def _compact_index(self):
+        """Quita del índice las capturas cuyo HTML ya se borró. Devuelve la variación de tamaño"""
+        index_path = os.path.join(self.root, INDEX_FILE)
+        try:
+            with open(index_path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return 0
+        keep = []
+        for line in lines:
+            try:
+                html_path = json.loads(line).get("html")
+            except ValueError:
+                continue
+            if html_path and os.path.exists(os.path.join(self.root, html_path)):
+                keep.append(line)
+        tmp_path = f"{index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(keep)
+        old_size = os.path.getsize(index_path)
+        os.replace(tmp_path, index_path)
+        return os.path.getsize(index_path) - old_size
+
+    def close(self):
+        """Escribe las capturas pendientes y detiene el hilo"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_diagnostics():
+    """Diagnóstico compartido por el proceso, o None si DEBUG_CAPTURE=false"""
+    global _shared
+    if os.getenv("DEBUG_CAPTURE", "true").lower() != "true":
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = Diagnostics.from_env()
+            atexit.register(_shared.close)
+        return _shared
@@ -0,0 +1,171 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+def driver_responds(driver):
+    """Comprueba que el navegador sigue respondiendo a comandos"""
+    try:
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+
+class DriverPool:
+    """
+    Pool de tamaño fijo de navegadores reutilizables
+
+    Los drivers se crean bajo demanda (hasta `size`), se prestan con `acquire()`
+    y se devuelven con `release()`. Al devolverlos se comprueba que siguen vivos;
+    si fallaron, superaron `max_uses` usos, su perfil quedó marcado (atributo
+    `flagged`, ver browser_profiles.py) o su memoria pasó de `max_memory_mb`
+    se cierran y se crea uno nuevo en el siguiente préstamo.
+
+    Args:
+        factory: Función sin argumentos que devuelve un WebDriver nuevo
+        size: Número máximo de navegadores vivos a la vez
+        max_uses: Usos tras los que un navegador se recicla (0 = sin límite)
+        max_memory_mb: Memoria a partir de la cual se recicla (0 = sin límite)
+        memory_check_every: Cada cuántos usos se mide la memoria
+        measure: Función (driver) -> MB de memoria, o None si no se puede medir
+    """
+
+    def __init__(self, factory, size, max_uses=50, max_memory_mb=0, memory_check_every=10, measure=None):
+        if size < 1:
+            raise ValueError("El tamaño del pool debe ser al menos 1")
+        self._factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._uses = {}
+        self._closed = False
+        self.max_memory_mb = max_memory_mb
+        self.memory_check_every = max(1, memory_check_every)
+        self._measure = measure
+        self.memory = {}
+        self.created = 0
+        self.recycled = 0
+        self.over_memory = 0
+
+    def acquire(self, timeout=None):
+        """Presta un navegador libre, creando uno si hace falta"""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No hay navegadores libres en el pool")
+        with self._lock:
+            if self._closed:
+                self._slots.release()
+                raise RuntimeError("El pool de navegadores está cerrado")
+            driver = self._idle.pop() if self._idle else None
+        if driver is not None:
+            return driver
+        try:
+            driver = self._factory()
+        except Exception:
+            self._slots.release()
+            raise
+        memory_mb = self._measure(driver) if self._measure else None
+        with self._lock:
+            self._uses[id(driver)] = 0
+            self.created += 1
+            if memory_mb is not None:
+                self.memory[id(driver)] = memory_mb
+        if memory_mb is None:
+            logger.info("Pool: navegador nuevo creado (%d en total)", self.created)
+        else:
+            logger.info("Pool: navegador nuevo creado (%d en total, %.0f MB)", self.created, memory_mb)
+        return driver
+
+    def release(self, driver, broken=False):
+        """Devuelve un navegador al pool, reciclándolo si está roto o gastado"""
+        try:
+            with self._lock:
+                uses = self._uses.get(id(driver), 0) + 1
+                self._uses[id(driver)] = uses
+                closed = self._closed
+            worn_out = self.max_uses and uses >= self.max_uses
+            flagged = getattr(driver, "flagged", False)
+            over_memory = not (closed or broken or worn_out or flagged) and self._over_memory(driver, uses)
+            if closed or broken or worn_out or flagged or over_memory or not self._is_healthy(driver):
+                reason = ("cerrado" if closed else "roto" if broken else "gastado" if worn_out
+                          else "perfil marcado" if flagged
+                          else f"{self.memory.get(id(driver), 0):.0f} MB de memoria" if over_memory
+                          else "no responde")
+                logger.info("Pool: reciclando navegador (%s, %d usos)", reason, uses)
+                self._discard(driver)
+            else:
+                with self._lock:
+                    self._idle.append(driver)
+        finally:
+            self._slots.release()
+
+    def warm(self):
+        """Arranca de antemano todos los navegadores del pool (sin contarlo como uso)"""
+        drivers = []
+        try:
+            for _ in range(self.size):
+                drivers.append(self.acquire())
+        finally:
+            with self._lock:
+                self._idle.extend(drivers)
+            for _ in drivers:
+                self._slots.release()
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Context manager: `with pool.driver() as d: ...`"""
+        driver = self.acquire(timeout=timeout)
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def close(self):
+        """Cierra todos los navegadores libres; los prestados se cierran al devolverse"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _over_memory(self, driver, uses):
+        """Mide la memoria cada `memory_check_every` usos. True si supera el límite"""
+        if not self._measure or uses % self.memory_check_every:
+            return False
+        memory_mb = self._measure(driver)
+        if memory_mb is None:
+            return False
+        with self._lock:
+            self.memory[id(driver)] = memory_mb
+        logger.info("Pool: navegador con %.0f MB tras %d usos", memory_mb, uses)
+        if self.max_memory_mb and memory_mb > self.max_memory_mb:
+            with self._lock:
+                self.over_memory += 1
+            return True
+        return False
+
+    def _is_healthy(self, driver):
+        return driver_responds(driver)
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            self.memory.pop(id(driver), None)
+            self.recycled += 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
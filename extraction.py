@@ -0,0 +1,134 @@
+import time
+
+# Recorre en el navegador toda la cascada de selectores (contenedor → resultados
+# → título/URL/descripción) y devuelve los datos en una sola respuesta.
+# Los selectores llegan como pares [tipo, valor] con los tipos de Selenium
+# ("css selector" o "xpath"); los XPath relativos (".//a") se evalúan sobre
+# cada resultado.
+EXTRACT_JS = r"""
+const cfg = arguments[0];
+
+function findFirst(root, type, value) {
+    if (type === "xpath") {
+        return document.evaluate(value, root, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    return root.querySelector(value);
+}
+
+function textOf(el) {
+    return el ? (el.innerText || "").trim() : "";
+}
+
+function firstText(root, selectors) {
+    for (const [type, value] of selectors) {
+        let el = null;
+        try { el = findFirst(root, type, value); } catch (e) { continue; }
+        const text = textOf(el);
+        if (text) return {text: text, selector: value};
+    }
+    return {text: null, selector: null};
+}
+
+function hrefOf(el) {
+    const link = el.tagName.toLowerCase() === "a" ? el : el.querySelector("a");
+    const href = link ? link.href : null;
+    return href && !href.startsWith("javascript") ? href : null;
+}
+
+const t0 = performance.now();
+let container = null, containerSelector = null;
+for (const selector of cfg.container) {
+    container = document.querySelector(selector);
+    if (container) { containerSelector = selector; break; }
+}
+if (!container) container = document.body;
+const t1 = performance.now();
+
+let nodes = [], resultSelector = null;
+for (const selector of cfg.results) {
+    nodes = Array.from(container.querySelectorAll(selector))
+        .filter(el => textOf(el).length > cfg.min_text);
+    if (nodes.length) { resultSelector = selector; break; }
+}
+if (cfg.limit) nodes = nodes.slice(0, cfg.limit);
+const t2 = performance.now();
+
+const results = nodes.map(el => {
+    const title = firstText(el, cfg.title);
+    const snippet = firstText(el, cfg.snippet);
+    return {
+        title: title.text,
+        title_selector: title.selector,
+        url: hrefOf(el),
+        snippet: snippet.text,
+        snippet_selector: snippet.selector,
+        text: textOf(el)
+    };
+});
+
+return {
+    container_selector: containerSelector,
+    result_selector: resultSelector,
+    results: results,
+    timings: {
+        container_lookup: t1 - t0,
+        selector_cascade: t2 - t1,
+        field_extraction: performance.now() - t2
+    }
+};
+"""
+
+
+def extract_results(driver, container_selectors, result_selectors, title_selectors,
+                    snippet_selectors, min_text=10, limit=None):
+    """
+    Extrae los resultados de la página con una única llamada a execute_script
+
+    Args:
+        container_selectors: Selectores CSS del contenedor de resultados, en orden
+        result_selectors: Selectores CSS de cada resultado, en orden
+        title_selectors: Pares (By.*, valor) para el título, en orden
+        snippet_selectors: Pares (By.*, valor) para la descripción, en orden
+        min_text: Longitud mínima del texto de un resultado (descarta pestañas)
+        limit: Número máximo de resultados a devolver (None = todos)
+
+    Returns:
+        Diccionario con `container_selector`, `result_selector` (None si no
+        coincidió ninguno), `results` (lista de dicts con title, url, snippet,
+        text y el selector que encontró cada campo), `timings` (ms de cada etapa
+        dentro del navegador) y `elapsed_ms` (total, incluida la ida y vuelta)
+    """
+    config = {
+        "container": list(container_selectors),
+        "results": list(result_selectors),
+        "title": [list(s) for s in title_selectors],
+        "snippet": [list(s) for s in snippet_selectors],
+        "min_text": min_text,
+        "limit": limit,
+    }
+    start = time.monotonic()
+    data = driver.execute_script(EXTRACT_JS, config)
+    data["elapsed_ms"] = (time.monotonic() - start) * 1000
+    return data
+
+
+def normalize_result(raw):
+    """
+    Completa un resultado crudo con los textos por defecto del scraper
+
+    Si no se encontró título, usa la primera línea del texto del resultado como
+    título y las dos siguientes como descripción.
+    """
+    title = raw.get("title") or "Título no encontrado"
+    url = raw.get("url") or "URL no encontrada"
+    snippet = raw.get("snippet") or "No hay descripción disponible"
+
+    if not raw.get("title"):
+        lines = [l.strip() for l in (raw.get("text") or "").split('\n') if l.strip()]
+        if lines:
+            title = lines[0]
+            if len(lines) > 1:
+                snippet = '\n'.join(lines[1:3])
+
+    return {"title": title, "url": url, "snippet": snippet}
@@ -0,0 +1,80 @@
+"""
+Descarga de páginas de resultados con HTTP simple, sin navegador
+
+Bing (y otros buscadores) devuelven los resultados en el HTML del servidor, así
+que una petición con `requests` basta para muchas búsquedas. Se usa una única
+`requests.Session` por proceso: mantiene las conexiones abiertas (keep-alive),
+las reutiliza entre búsquedas y guarda las cookies como un navegador. Las
+cabeceras imitan a Chrome con el mismo User-Agent que usa Selenium.
+"""
+import re
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def browser_headers(user_agent, accept_language="es-ES,es;q=0.9,en;q=0.8"):
+    """Cabeceras de una navegación normal de Chrome con `user_agent`"""
+    match = re.search(r"Chrome/(\d+)", user_agent)
+    version = match.group(1) if match else "121"
+    platform = "Windows" if "Windows" in user_agent else "macOS" if "Mac OS" in user_agent else "Linux"
+    return {
+        "User-Agent": user_agent,
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,"
+                  "image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+        "Accept-Language": accept_language,
+        "Accept-Encoding": "gzip, deflate",
+        "Upgrade-Insecure-Requests": "1",
+        "sec-ch-ua": f'"Not A(Brand";v="99", "Google Chrome";v="{version}", "Chromium";v="{version}"',
+        "sec-ch-ua-mobile": "?0",
+        "sec-ch-ua-platform": f'"{platform}"',
+        "Sec-Fetch-Dest": "document",
+        "Sec-Fetch-Mode": "navigate",
+        "Sec-Fetch-Site": "none",
+        "Sec-Fetch-User": "?1",
+    }
+
+
+class HttpFetcher:
+    """
+    Args:
+        user_agent: User-Agent (el mismo que el navegador)
+        timeout: Segundos máximos por petición
+        pool_size: Conexiones abiertas por host (normalmente el número de hilos)
+    """
+
+    def __init__(self, user_agent, timeout=10, pool_size=10):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(browser_headers(user_agent))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url, referer=None):
+        """
+        Descarga `url` siguiendo redirecciones
+
+        Returns:
+            (código HTTP, URL final, HTML)
+        """
+        headers = {"Referer": referer, "Sec-Fetch-Site": "same-origin"} if referer else None
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        return response.status_code, response.url, response.text
+
+    def close(self):
+        self.session.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_fetcher(user_agent, timeout=10, pool_size=10):
+    """Fetcher compartido por el proceso (una sola sesión y pool de conexiones)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HttpFetcher(user_agent, timeout=timeout, pool_size=pool_size)
+        return _shared
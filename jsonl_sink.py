@@ -0,0 +1,88 @@
+import gzip
+import json
+import os
+import threading
+
+
+class JsonlSink:
+    """
+    Salida en streaming: un registro JSON por línea, añadido al final del archivo
+
+    Cada registro se escribe y se vuelca a disco en cuanto se produce, así la
+    memoria no crece durante un batch largo y otros procesos pueden hacer
+    `tail -f` del archivo. Es seguro usarlo desde varios hilos.
+
+    Args:
+        path: Ruta del archivo (se crea el directorio si no existe)
+        compress: Si True, escribe gzip (se añade '.gz' a la ruta si falta).
+            Cada apertura añade un miembro gzip nuevo; `zcat` los lee todos seguidos
+    """
+
+    def __init__(self, path, compress=False):
+        if compress and not path.endswith(".gz"):
+            path += ".gz"
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if compress:
+            self._file = gzip.open(path, "at", encoding="utf-8")
+        else:
+            self._file = open(path, "a", encoding="utf-8")
+
+    @classmethod
+    def from_env(cls):
+        """Crea el sink configurado en .env (OUTPUT_JSONL, OUTPUT_GZIP)"""
+        path = os.getenv("OUTPUT_JSONL", "output/resultados.jsonl")
+        compress = os.getenv("OUTPUT_GZIP", "false").lower() == "true"
+        return cls(path, compress=compress)
+
+    def write(self, record):
+        """Añade un registro y lo vuelca a disco"""
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MemorySink:
+    """
+    Sink en memoria con la misma interfaz que JsonlSink
+
+    Sirve para retener los registros de una búsqueda y publicarlos después solo
+    si procede (p. ej. el worker de la cola, que no debe duplicar resultados).
+    """
+
+    def __init__(self):
+        self.path = "(memoria)"
+        self.records = []
+        self._lock = threading.Lock()
+
+    @property
+    def count(self):
+        return len(self.records)
+
+    def write(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,136 @@
+"""
+Configuración de logging del scraper: niveles, campos estructurados y escritura en segundo plano
+
+Los hilos de búsqueda no escriben en consola ni en disco: un QueueHandler deja
+cada registro en una cola y un QueueListener (hilo aparte) lo formatea y lo
+escribe. Cada registro lleva el contexto de la búsqueda activa en su hilo
+(ver metrics.py): `query_id`, `engine`, `phase` (fase en curso) y `elapsed_ms`
+(desde el inicio de la búsqueda).
+
+Configuración (.env):
+    LOG_LEVEL   DEBUG, INFO (por defecto), SUCCESS, WARNING o ERROR
+    LOG_FORMAT  'text' (legible) o 'json' (una línea JSON por registro)
+    LOG_FILE    Archivo donde se añaden además los registros en JSON (vacío = ninguno)
+
+Los mensajes aceptan argumentos al estilo de logging (`log_debug("%d resultados", n)`):
+solo se formatean si el nivel está activo.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+
+import metrics
+
+# Nivel entre INFO y WARNING para los pasos completados con éxito
+SUCCESS = 25
+logging.addLevelName(SUCCESS, "SUCCESS")
+
+# Campos de contexto que se añaden a cada registro
+CONTEXT_FIELDS = ("query_id", "engine", "phase", "elapsed_ms")
+
+TEXT_FORMAT = "[%(asctime)s] %(levelname)-8s | %(context)s%(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+class ContextFilter(logging.Filter):
+    """Añade al registro el contexto de la búsqueda activa en el hilo que lo emite"""
+
+    def filter(self, record):
+        query = metrics.current()
+        if query is None:
+            record.query_id = record.engine = record.phase = record.elapsed_ms = None
+            record.context = ""
+        else:
+            record.query_id = query.id
+            record.engine = query.engine
+            record.phase = query.active_phase
+            record.elapsed_ms = query.elapsed_ms()
+            record.context = f"{query.engine}#{query.id} "
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro con el contexto de la búsqueda"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = round(value, 1) if field == "elapsed_ms" else value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+
+class _ContextQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que deja el formateo al hilo del listener"""
+
+    def prepare(self, record):
+        # Solo se resuelve el mensaje (los argumentos pueden cambiar después);
+        # el formateo completo (texto o JSON) lo hace el listener
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _level(name):
+    level = logging.getLevelName(name.upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Nivel de log desconocido: {name}")
+    return level
+
+
+def setup_logging():
+    """Configura el logger raíz según .env (una sola vez por proceso). Devuelve el QueueListener"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+
+        console = logging.StreamHandler(sys.stderr)
+        if os.getenv("LOG_FORMAT", "text").lower() == "json":
+            console.setFormatter(JsonFormatter())
+        else:
+            console.setFormatter(logging.Formatter(TEXT_FORMAT, DATE_FORMAT))
+        handlers = [console]
+        log_file = os.getenv("LOG_FILE", "")
+        if log_file:
+            os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+            file_handler = logging.FileHandler(log_file, encoding="utf-8")
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+
+        handler = _ContextQueueHandler(queue.SimpleQueue())
+        handler.addFilter(ContextFilter())
+        root = logging.getLogger()
+        for old in list(root.handlers):
+            root.removeHandler(old)
+        root.addHandler(handler)
+        root.setLevel(_level(os.getenv("LOG_LEVEL", "INFO")))
+
+        _listener = logging.handlers.QueueListener(handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        # Escribir lo pendiente antes de salir
+        atexit.register(_listener.stop)
+        return _listener
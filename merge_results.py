@@ -0,0 +1,88 @@
+import base64
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Parámetros de seguimiento que no cambian la página de destino
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "ved", "ei", "sa", "usg", "ref", "form"}
+
+
+def _unwrap_redirect(url):
+    """Extrae el destino real de los enlaces de redirección de Google y Bing"""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    query = parse_qs(parts.query)
+    # Google: https://www.google.com/url?q=<destino>&...
+    if host.endswith("google.com") and parts.path == "/url":
+        target = (query.get("q") or query.get("url") or [None])[0]
+        if target:
+            return target
+    # Bing: https://www.bing.com/ck/a?...&u=a1<destino en base64 url-safe>
+    if host.endswith("bing.com") and parts.path == "/ck/a":
+        encoded = (query.get("u") or [""])[0]
+        if encoded.startswith("a1"):
+            encoded = encoded[2:]
+            try:
+                return base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode("utf-8")
+            except (ValueError, UnicodeDecodeError):
+                pass
+    return url
+
+
+def normalize_url(url):
+    """
+    Forma canónica de una URL para detectar duplicados entre buscadores
+
+    Deshace las redirecciones de los buscadores, ignora el esquema, 'www.', el
+    fragmento, la barra final y los parámetros de seguimiento (utm_*, gclid...).
+    Devuelve None si `url` no es una URL absoluta.
+    """
+    if not url or "://" not in url:
+        return None  # Sin URL real (p. ej. "URL no encontrada"): no se puede comparar
+    parts = urlsplit(_unwrap_redirect(url))
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+              if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("", host, path, urlencode(sorted(params)), ""))
+
+
+def merge_ranked(results_by_engine):
+    """
+    Mezcla las listas ordenadas de varios buscadores sin URLs repetidas
+
+    Se intercalan por posición (1º de cada buscador, luego 2º...), en el orden
+    de `results_by_engine`. Si una URL aparece en varios buscadores se queda la
+    primera aparición y se anotan todos los buscadores y sus posiciones.
+
+    Args:
+        results_by_engine: {buscador: lista de resultados con rank, title, url, snippet}
+
+    Returns:
+        Lista de resultados con rank nuevo, `engines` y `engine_ranks`
+    """
+    merged = []
+    by_url = {}
+    longest = max((len(items) for items in results_by_engine.values()), default=0)
+    for position in range(longest):
+        for engine, items in results_by_engine.items():
+            if position >= len(items):
+                continue
+            item = items[position]
+            key = normalize_url(item["url"]) or f"{engine}:{item['rank']}"
+            if key in by_url:
+                existing = by_url[key]
+                existing["engines"].append(engine)
+                existing["engine_ranks"][engine] = item["rank"]
+                continue
+            entry = {
+                "rank": len(merged) + 1,
+                "title": item["title"],
+                "url": item["url"],
+                "snippet": item["snippet"],
+                "engines": [engine],
+                "engine_ranks": {engine: item["rank"]},
+            }
+            by_url[key] = entry
+            merged.append(entry)
+    return merged
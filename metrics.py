@@ -0,0 +1,207 @@
+"""
+Métricas por búsqueda: tiempo de cada fase y qué selectores encontraron algo
+
+Cada búsqueda abre un registro con `start()`; el código marca sus fases con
+`with span("fase"):` y, al terminar, `finish(estado)` añade una línea JSON a
+METRICS_PATH y, si METRICS_PROM_PATH está definido, reescribe un archivo de
+texto en formato Prometheus (para el textfile collector de node_exporter) con
+los acumulados del proceso.
+
+El registro activo es por hilo, así que funciona igual en modo batch.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+NO_MATCH = "(ninguno)"
+
+_local = threading.local()
+_emit_lock = threading.Lock()
+
+# Acumulados del proceso para el archivo de Prometheus
+_phase_sum = defaultdict(float)
+_phase_count = Counter()
+_queries = Counter()
+_selector_hits = Counter()
+
+
+class QueryMetrics:
+    """Tiempos y aciertos de selectores de una búsqueda"""
+
+    def __init__(self, query, engine):
+        self.id = uuid.uuid4().hex[:8]
+        self.query = query
+        self.engine = engine
+        self.started = time.monotonic()
+        self.active = []
+        self.phases = defaultdict(float)
+        self.selectors = defaultdict(Counter)
+        self.results = 0
+
+    def add_phase(self, name, ms):
+        self.phases[name] += ms
+
+    @property
+    def active_phase(self):
+        """Fase en curso más interna, o None"""
+        return self.active[-1] if self.active else None
+
+    def elapsed_ms(self):
+        return (time.monotonic() - self.started) * 1000
+
+    @contextmanager
+    def phase(self, name):
+        start = time.monotonic()
+        self.active.append(name)
+        try:
+            yield
+        finally:
+            self.active.pop()
+            self.add_phase(name, (time.monotonic() - start) * 1000)
+
+    def record_selector(self, field, selector):
+        self.selectors[field][selector or NO_MATCH] += 1
+
+    def to_record(self, status):
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "query_id": self.id,
+            "query": self.query,
+            "engine": self.engine,
+            "status": status,
+            "results": self.results,
+            "total_ms": round(self.elapsed_ms(), 2),
+            "phases": {name: round(ms, 2) for name, ms in self.phases.items()},
+            "selectors": {field: dict(counts) for field, counts in self.selectors.items()},
+        }
+
+
+def enabled():
+    return os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def start(query, engine):
+    """Abre el registro de métricas de una búsqueda en este hilo"""
+    metrics = QueryMetrics(query, engine)
+    _stack().append(metrics)
+    return metrics
+
+
+def current():
+    """Registro activo en este hilo, o None"""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def span(name):
+    """Mide una fase de la búsqueda activa (no hace nada si no hay ninguna)"""
+    metrics = current()
+    if metrics is None:
+        yield
+        return
+    with metrics.phase(name):
+        yield
+
+
+def add_phase(name, ms):
+    metrics = current()
+    if metrics is not None:
+        metrics.add_phase(name, ms)
+
+
+def record_selector(field, selector):
+    metrics = current()
+    if metrics is not None:
+        metrics.record_selector(field, selector)
+
+
+def record_extraction(extraction):
+    """Anota los tiempos internos y los selectores ganadores de una extracción"""
+    metrics = current()
+    if metrics is None:
+        return
+    for name, ms in extraction.get("timings", {}).items():
+        metrics.add_phase(name, ms)
+    metrics.record_selector("container", extraction["container_selector"])
+    metrics.record_selector("results", extraction["result_selector"])
+    for result in extraction["results"]:
+        metrics.record_selector("title", result["title_selector"])
+        metrics.record_selector("snippet", result["snippet_selector"])
+    metrics.results += len(extraction["results"])
+
+
+def finish(status):
+    """Cierra el registro activo y lo exporta. Devuelve el registro (o None)"""
+    stack = _stack()
+    if not stack:
+        return None
+    record = stack.pop().to_record(status)
+    if enabled():
+        _export(record)
+    return record
+
+
+def _export(record):
+    path = os.getenv("METRICS_PATH", "output/metrics.jsonl")
+    prom_path = os.getenv("METRICS_PROM_PATH", "")
+    line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+    with _emit_lock:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+        if prom_path:
+            engine = record["engine"]
+            _queries[(engine, record["status"])] += 1
+            for name, ms in record["phases"].items():
+                _phase_sum[(engine, name)] += ms / 1000
+                _phase_count[(engine, name)] += 1
+            for field, counts in record["selectors"].items():
+                for selector, hits in counts.items():
+                    _selector_hits[(engine, field, selector)] += hits
+            _write_prometheus(prom_path)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _write_prometheus(path):
+    lines = [
+        "# HELP scraper_queries_total Búsquedas terminadas por buscador y estado",
+        "# TYPE scraper_queries_total counter",
+    ]
+    for (engine, status), count in sorted(_queries.items()):
+        lines.append(f'scraper_queries_total{{engine="{engine}",status="{status}"}} {count}')
+    lines += [
+        "# HELP scraper_phase_seconds Tiempo por fase de la búsqueda",
+        "# TYPE scraper_phase_seconds summary",
+    ]
+    for (engine, phase), total in sorted(_phase_sum.items()):
+        labels = f'engine="{engine}",phase="{phase}"'
+        lines.append(f"scraper_phase_seconds_sum{{{labels}}} {total:.6f}")
+        lines.append(f"scraper_phase_seconds_count{{{labels}}} {_phase_count[(engine, phase)]}")
+    lines += [
+        "# HELP scraper_selector_hits_total Veces que cada selector encontró el campo",
+        "# TYPE scraper_selector_hits_total counter",
+    ]
+    for (engine, field, selector), hits in sorted(_selector_hits.items()):
+        lines.append(f'scraper_selector_hits_total{{engine="{engine}",field="{field}",'
+                     f'selector="{_label(selector)}"}} {hits}')
+    # Escritura atómica: el collector nunca lee un archivo a medias
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
@@ -0,0 +1,142 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Tiempos (segundos) ajustados por buscador. `quiet_ms` es cuánto tiempo sin
+# mutaciones en el DOM se considera "página estable".
+READINESS_PROFILES = {
+    "google": {
+        "ready_timeout": 10,
+        "quiet_ms": 400,
+        "quiet_timeout": 3,
+        "results_timeout": 10,
+        "stable_polls": 3,
+        "poll": 0.1,
+    },
+    "bing": {
+        "ready_timeout": 8,
+        "quiet_ms": 250,
+        "quiet_timeout": 2,
+        "results_timeout": 8,
+        "stable_polls": 2,
+        "poll": 0.1,
+    },
+}
+
+# Instala (una vez por documento) un MutationObserver que guarda el instante de
+# la última mutación, y devuelve los ms transcurridos desde entonces
+_QUIET_JS = """
+if (!window.__scraperObserver) {
+    window.__scraperLastMutation = performance.now();
+    window.__scraperObserver = new MutationObserver(function () {
+        window.__scraperLastMutation = performance.now();
+    });
+    window.__scraperObserver.observe(document, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+}
+return performance.now() - window.__scraperLastMutation;
+"""
+
+_COUNT_JS = "return document.querySelectorAll(arguments[0]).length;"
+
+
+def get_profile(search_engine):
+    """Devuelve los tiempos de espera del buscador (o los de Bing si es desconocido)"""
+    return READINESS_PROFILES.get(search_engine, READINESS_PROFILES["bing"])
+
+
+def wait_until(condition, timeout, poll=0.1):
+    """
+    Evalúa `condition()` cada `poll` segundos hasta que sea verdadera o pase `timeout`
+
+    Las excepciones de `condition` cuentan como "todavía no".
+
+    Returns:
+        (cumplida, segundos_esperados)
+    """
+    start = time.monotonic()
+    while True:
+        try:
+            if condition():
+                return True, time.monotonic() - start
+        except Exception:
+            pass
+        if time.monotonic() - start >= timeout:
+            return False, time.monotonic() - start
+        time.sleep(poll)
+
+
+def wait_document_ready(driver, timeout, poll=0.1):
+    """Espera a que document.readyState sea 'complete'"""
+    return wait_until(
+        lambda: driver.execute_script("return document.readyState") == "complete",
+        timeout, poll,
+    )
+
+
+def wait_dom_quiet(driver, quiet_ms, timeout, poll=0.1):
+    """Espera a que el DOM pase `quiet_ms` milisegundos sin mutaciones"""
+    return wait_until(
+        lambda: driver.execute_script(_QUIET_JS) >= quiet_ms,
+        timeout, poll,
+    )
+
+
+def wait_results_stable(driver, selectors, timeout, stable_polls=3, poll=0.1):
+    """
+    Espera a que haya resultados y su número no cambie durante `stable_polls` sondeos
+
+    Args:
+        selectors: Lista de selectores CSS de resultados del buscador
+    """
+    query = ", ".join(selectors)
+    state = {"last": -1, "stable": 0}
+
+    def _stable():
+        count = driver.execute_script(_COUNT_JS, query)
+        if count and count == state["last"]:
+            state["stable"] += 1
+        else:
+            state["stable"] = 0
+        state["last"] = count
+        return state["stable"] >= stable_polls
+
+    return wait_until(_stable, timeout, poll)
+
+
+def wait_page_settled(driver, search_engine):
+    """
+    Espera a que una página normal (inicio, tras aceptar cookies) esté lista
+
+    Returns:
+        Diccionario con los segundos que tardó cada espera
+    """
+    profile = get_profile(search_engine)
+    timings = {}
+    _, timings["ready_state"] = wait_document_ready(driver, profile["ready_timeout"], profile["poll"])
+    _, timings["dom_quiet"] = wait_dom_quiet(driver, profile["quiet_ms"], profile["quiet_timeout"], profile["poll"])
+    return timings
+
+
+def wait_results_ready(driver, search_engine, selectors):
+    """
+    Espera a que la página de resultados esté lista para extraer
+
+    Returns:
+        (hay_resultados_estables, diccionario con los segundos de cada espera)
+    """
+    profile = get_profile(search_engine)
+    timings = {}
+    _, timings["ready_state"] = wait_document_ready(driver, profile["ready_timeout"], profile["poll"])
+    stable, timings["results_stable"] = wait_results_stable(
+        driver, selectors, profile["results_timeout"], profile["stable_polls"], profile["poll"]
+    )
+    _, timings["dom_quiet"] = wait_dom_quiet(driver, profile["quiet_ms"], profile["quiet_timeout"], profile["poll"])
+    return stable, timings
+
+
+def format_timings(timings):
+    """Formatea un diccionario de esperas para los logs: 'ready_state=0.12s, ...'"""
+    return ", ".join(f"{name}={secs:.2f}s" for name, secs in timings.items())
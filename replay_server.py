@@ -0,0 +1,197 @@
+"""
+Servidor local de páginas de resultados grabadas, para medir el scraper sin red
+
+Sirve los HTML de `fixtures/serp/` imitando a cada buscador bajo su propio
+prefijo (http://127.0.0.1:<puerto>/google, .../bing). Apuntando GOOGLE_BASE_URL
+y BING_BASE_URL a esas direcciones, search_google_news funciona igual que contra
+los buscadores reales:
+
+    /<buscador>                  → <buscador>_home.html (flujo con formulario)
+    /<buscador>/search?q=...     → <buscador>_results*.html (se alternan por búsqueda)
+    /google/search sin cookie    → google_consent.html (si consent=True); el botón
+                                   "Aceptar todo" guarda la cookie CONSENT y recarga
+    búsqueda con "captcha"       → Google: redirección a /google/sorry/ (google_sorry.html)
+                                   Bing: bing_captcha.html
+
+En los HTML se sustituyen {{query}}, {{query_url}}, {{page}} y {{base}}. Se pueden
+añadir páginas reales guardadas (p. ej. una captura de output/debug/html/,
+descomprimida con gunzip) como fixtures/serp/<buscador>_results_<nombre>.html.
+
+Uso:
+    python replay_server.py [--port 8800] [--latency 50] [--no-consent]
+"""
+import glob
+import html
+import logging
+import os
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote_plus, urlsplit
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "serp")
+
+# Parámetro de paginación de cada buscador y su valor para la primera página
+_PAGE_PARAMS = {"google": ("start", 0), "bing": ("first", 1)}
+
+
+class ReplayServer:
+    """
+    Args:
+        fixtures_dir: Carpeta con los HTML (<buscador>_home.html, <buscador>_results*.html...)
+        host, port: Dirección de escucha (port=0 elige un puerto libre)
+        latency: Milisegundos de espera antes de cada respuesta (simula la red)
+        consent: Si True, Google muestra el diálogo de cookies hasta aceptarlo
+    """
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, host="127.0.0.1", port=0, latency=0, consent=True):
+        self.fixtures_dir = fixtures_dir
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.consent = consent
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._fixtures = {}
+        for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.html"))):
+            with open(path, encoding="utf-8") as f:
+                self._fixtures[os.path.basename(path)[:-5]] = f.read()
+        self.engines = sorted({name.split("_")[0] for name in self._fixtures if "_results" in name})
+        if not self.engines:
+            raise ValueError(f"No hay páginas de resultados en {fixtures_dir}")
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def base_urls(self):
+        """{buscador: URL base} para GOOGLE_BASE_URL / BING_BASE_URL"""
+        return {engine: f"{self.url}/{engine}" for engine in self.engines}
+
+    def render(self, name, engine, query="", page=1):
+        """HTML de `name` con las variables sustituidas"""
+        return (self._fixtures[name]
+                .replace("{{query}}", html.escape(query))
+                .replace("{{query_url}}", html.escape(quote_plus(query)))
+                .replace("{{page}}", str(page))
+                .replace("{{base}}", f"/{engine}"))
+
+    def results_fixture(self, engine, query):
+        """Página de resultados para `query`: siempre la misma para la misma búsqueda"""
+        variants = sorted(name for name in self._fixtures if name.startswith(f"{engine}_results"))
+        return variants[zlib.crc32(query.encode("utf-8")) % len(variants)]
+
+    def route(self, path, cookies=""):
+        """
+        Decide la respuesta de una petición GET
+
+        Returns:
+            (código HTTP, cabeceras extra, HTML)
+        """
+        parts = urlsplit(path)
+        segments = [s for s in parts.path.split("/") if s]
+        if not segments or segments[0] not in self.engines:
+            return 404, {}, "<h1>404</h1>"
+        engine, rest = segments[0], segments[1:]
+        params = parse_qs(parts.query)
+        query = (params.get("q") or params.get("continue") or [""])[0]
+
+        if not rest:
+            return 200, {}, self.render(f"{engine}_home", engine)
+        if rest[0] == "sorry":
+            return 200, {}, self.render("google_sorry", engine, query)
+        if rest[0] != "search":
+            return 404, {}, "<h1>404</h1>"
+
+        if "captcha" in query.lower():
+            if engine == "google":
+                return 302, {"Location": f"/google/sorry/index?continue={quote_plus(query)}"}, ""
+            return 200, {}, self.render(f"{engine}_captcha", engine, query)
+        if engine == "google" and self.consent and "CONSENT=YES" not in cookies:
+            return 200, {}, self.render("google_consent", engine, query)
+
+        param, first = _PAGE_PARAMS.get(engine, ("start", 0))
+        try:
+            page = (int(params.get(param, [first])[0]) - first) // 10 + 1
+        except ValueError:
+            page = 1
+        return 200, {}, self.render(self.results_fixture(engine, query), engine, query, page)
+
+    def start(self):
+        """Arranca el servidor en un hilo en segundo plano. Devuelve su URL"""
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                logger.debug("Replay " + fmt % args)
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency / 1000)
+                code, headers, body = server.route(self.path, self.headers.get("Cookie", ""))
+                data = body.encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv):
+    port, latency, consent = 8800, 0, True
+    args = iter(argv)
+    for arg in args:
+        if arg == "--port":
+            port = int(next(args, "8800"))
+        elif arg == "--latency":
+            latency = float(next(args, "0"))
+        elif arg == "--no-consent":
+            consent = False
+        else:
+            print(__doc__)
+            return 1
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)-8s | %(message)s")
+    server = ReplayServer(port=port, latency=latency, consent=consent)
+    server.start()
+    for engine, url in server.base_urls().items():
+        print(f"{engine.upper()}_BASE_URL={url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,90 @@
+import json
+import os
+
+# Patrones de URL bloqueados por categoría (sintaxis de Network.setBlockedURLs:
+# '*' es comodín). Ni el HTML ni el CSS/JS de los buscadores se bloquean, así
+# que el marcado de resultados se sigue renderizando igual.
+BLOCK_CATEGORIES = {
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+               "*th.bing.com/th*", "*encrypted-tbn*.gstatic.com*"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*fonts.gstatic.com*"],
+    "media": ["*.mp4", "*.webm", "*.m3u8", "*.mp3", "*.ogg"],
+    "trackers": ["*doubleclick.net*", "*googlesyndication.com*", "*googleadservices.com*",
+                 "*google-analytics.com*", "*googletagmanager.com*", "*bat.bing.com*",
+                 "*clarity.ms*", "*scorecardresearch.com*"],
+}
+
+# Patrones que NO se bloquean en cada buscador aunque estén en una categoría
+# activa: los SVG forman parte del maquetado de las tarjetas de resultados
+ENGINE_ALLOWLIST = {
+    "google": ["*.svg"],
+    "bing": ["*.svg"],
+}
+
+
+def blocked_patterns(search_engine, categories=None, extra=None):
+    """
+    Lista de patrones a bloquear para un buscador
+
+    Args:
+        categories: Categorías de BLOCK_CATEGORIES. Si None, lee BLOCK_RESOURCES del
+            .env (por defecto todas). Cadena vacía = no bloquear nada
+        extra: Patrones adicionales. Si None, lee BLOCK_URL_PATTERNS del .env
+    """
+    if categories is None:
+        categories = os.getenv("BLOCK_RESOURCES", ",".join(BLOCK_CATEGORIES))
+    if isinstance(categories, str):
+        categories = [c.strip().lower() for c in categories.split(",") if c.strip()]
+    if extra is None:
+        extra = [p.strip() for p in os.getenv("BLOCK_URL_PATTERNS", "").split(",") if p.strip()]
+
+    allowed = set(ENGINE_ALLOWLIST.get(search_engine, []))
+    patterns = []
+    for category in categories:
+        for pattern in BLOCK_CATEGORIES.get(category, []):
+            if pattern not in allowed and pattern not in patterns:
+                patterns.append(pattern)
+    patterns.extend(p for p in extra if p not in patterns)
+    return patterns
+
+
+def apply_blocking(driver, search_engine):
+    """Activa el bloqueo en el navegador (pestaña actual). Devuelve los patrones usados"""
+    patterns = blocked_patterns(search_engine)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    return patterns
+
+
+def stats_enabled():
+    """True si RESOURCE_STATS=true (requiere el log de rendimiento de Chrome)"""
+    return os.getenv("RESOURCE_STATS", "false").lower() == "true"
+
+
+def enable_stats(chrome_options):
+    """Activa el log de rendimiento de Chrome, del que salen las estadísticas"""
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+def collect_stats(driver):
+    """
+    Lee (y vacía) el log de rendimiento y resume las peticiones de red
+
+    Returns:
+        {"requests": cargadas, "bytes": bytes transferidos, "blocked": bloqueadas}
+    """
+    stats = {"requests": 0, "bytes": 0, "blocked": 0}
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        method = message.get("method")
+        if method == "Network.loadingFinished":
+            stats["requests"] += 1
+            stats["bytes"] += int(message["params"].get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and message["params"].get("blockedReason"):
+            stats["blocked"] += 1
+    return stats
+
+
+def format_stats(stats):
+    return (f"{stats['requests']} peticiones, {stats['bytes'] / 1024:.0f} KB transferidos, "
+            f"{stats['blocked']} peticiones bloqueadas")
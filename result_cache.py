@@ -0,0 +1,141 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+
+def normalize_query(query):
+    """Normaliza la búsqueda para la clave: Unicode NFC, minúsculas y espacios simples"""
+    return " ".join(unicodedata.normalize("NFC", query).casefold().split())
+
+
+def default_locale():
+    """Idioma y zona horaria del entorno: cambian los resultados de la misma búsqueda"""
+    return os.getenv("CACHE_LOCALE") or f"{os.getenv('LANG', '')}|{os.getenv('TZ', '')}"
+
+
+class ResultCache:
+    """
+    Caché persistente (SQLite) de resultados por (buscador, búsqueda, idioma/zona)
+
+    Las entradas caducan a los `ttl` segundos y, si hay más de `max_entries`,
+    se eliminan las usadas hace más tiempo (LRU). Es segura entre hilos y, gracias
+    al modo WAL, también entre procesos que compartan el archivo.
+
+    Args:
+        path: Archivo SQLite (se crea el directorio si no existe)
+        ttl: Segundos de validez de cada entrada
+        max_entries: Número máximo de entradas guardadas
+    """
+
+    def __init__(self, path, ttl=900, max_entries=1000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                engine TEXT NOT NULL,
+                query TEXT NOT NULL,
+                locale TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (engine, query, locale)
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    @classmethod
+    def from_env(cls):
+        """Crea la caché configurada en .env (CACHE_PATH, CACHE_TTL, CACHE_MAX_ENTRIES)"""
+        return cls(
+            os.getenv("CACHE_PATH", "output/cache.sqlite3"),
+            ttl=float(os.getenv("CACHE_TTL", "900")),
+            max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "1000")),
+        )
+
+    def get(self, engine, query, locale=None):
+        """Devuelve el resultado guardado, o None si no existe o ha caducado"""
+        key = (engine, normalize_query(query), locale if locale is not None else default_locale())
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT created, value FROM results WHERE engine=? AND query=? AND locale=?", key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            created, value = row
+            if now - created > self.ttl:
+                self._db.execute("DELETE FROM results WHERE engine=? AND query=? AND locale=?", key)
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE results SET accessed=? WHERE engine=? AND query=? AND locale=?", (now, *key)
+            )
+            self.hits += 1
+        return json.loads(value)
+
+    def put(self, engine, query, value, locale=None):
+        """Guarda un resultado y aplica el límite de tamaño (LRU)"""
+        key = (engine, normalize_query(query), locale if locale is not None else default_locale())
+        now = time.time()
+        data = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (engine, query, locale, created, accessed, value) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (*key, now, now, data)
+            )
+            (count,) = self._db.execute("SELECT COUNT(*) FROM results").fetchone()
+            excess = count - self.max_entries
+            if excess > 0:
+                self._db.execute(
+                    "DELETE FROM results WHERE rowid IN "
+                    "(SELECT rowid FROM results ORDER BY accessed LIMIT ?)", (excess,)
+                )
+                self.evictions += excess
+
+    def stats(self):
+        """Contadores de uso desde que se abrió la caché"""
+        with self._lock:
+            (entries,) = self._db.execute("SELECT COUNT(*) FROM results").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": entries,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_cache():
+    """Caché compartida por el proceso, o None si CACHE_ENABLED=false"""
+    global _shared
+    if os.getenv("CACHE_ENABLED", "true").lower() != "true":
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = ResultCache.from_env()
+        return _shared
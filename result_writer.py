@@ -0,0 +1,290 @@
+"""
+Escritura de resultados en segundo plano, por lotes y con rotación de archivos
+
+Los hilos de búsqueda solo dejan cada registro en una cola acotada; un hilo
+escritor los agrupa (hasta `batch_size` registros o `flush_interval` segundos)
+y los añade al archivo de una vez. Si la cola se llena, `write()` espera: el
+disco marca el ritmo en lugar de acumular memoria sin límite.
+
+Formatos (OUTPUT_FORMAT):
+    jsonl   Un registro JSON compacto por línea (opcionalmente gzip)
+    csv     Una fila por resultado con las columnas de FIELDS
+    sqlite  Tabla `results` de un archivo SQLite
+
+El archivo se rota por tamaño (OUTPUT_ROTATE_MB) o por día (OUTPUT_ROTATE_DAILY):
+el actual se renombra a resultados.<fecha>.jsonl y se empieza uno nuevo. Otros
+formatos implementan la interfaz de `ResultFormat` y se registran con
+`register_format()`.
+"""
+import csv
+import gzip
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Columnas de cada resultado (CSV y SQLite)
+FIELDS = ("timestamp", "search_query", "engine", "rank", "page", "title", "url", "snippet")
+
+
+class ResultFormat:
+    """
+    Interfaz de los formatos de salida. Todos los métodos se llaman desde el
+    hilo escritor, nunca a la vez
+
+    Args:
+        path: Archivo de salida (ya existe su directorio)
+    """
+    extension = ""
+
+    def __init__(self, path):
+        self.path = path
+
+    def write_batch(self, records):
+        """Añade los registros y los vuelca a disco"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonlFormat(ResultFormat):
+    extension = ".jsonl"
+
+    def __init__(self, path, compress=False):
+        super().__init__(path)
+        if compress:
+            self._file = gzip.open(path, "at", encoding="utf-8")
+        else:
+            self._file = open(path, "a", encoding="utf-8")
+
+    def write_batch(self, records):
+        self._file.write("".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n"
+                                 for r in records))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class CsvFormat(ResultFormat):
+    extension = ".csv"
+
+    def __init__(self, path):
+        super().__init__(path)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDS, extrasaction="ignore")
+        if new_file:
+            self._writer.writeheader()
+
+    def write_batch(self, records):
+        self._writer.writerows(records)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class SQLiteFormat(ResultFormat):
+    extension = ".sqlite3"
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(f"{name} {'INTEGER' if name in ('rank', 'page') else 'TEXT'}" for name in FIELDS)
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS results ({columns})")
+        self._insert = f"INSERT INTO results ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})"
+
+    def write_batch(self, records):
+        self._db.execute("BEGIN")
+        try:
+            self._db.executemany(self._insert, [tuple(r.get(name) for name in FIELDS) for r in records])
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def close(self):
+        self._db.close()
+
+
+FORMATS = {
+    "jsonl": JsonlFormat,
+    "csv": CsvFormat,
+    "sqlite": SQLiteFormat,
+}
+
+
+def register_format(name, factory):
+    """Registra un formato: `factory(path)` devuelve un ResultFormat"""
+    FORMATS[name] = factory
+
+
+def rotated_path(path, stamp):
+    """resultados.jsonl.gz + 2025-12-17 → resultados.2025-12-17.jsonl.gz"""
+    directory, name = os.path.split(path)
+    stem, dot, extension = name.partition(".")
+    return os.path.join(directory, f"{stem}.{stamp}{dot}{extension}")
+
+
+_STOP = object()
+
+
+class ResultWriter:
+    """
+    Sink con la misma interfaz que JsonlSink que escribe en un hilo aparte
+
+    Args:
+        path: Ruta del archivo (se crea el directorio si no existe)
+        fmt: Formato de FORMATS ('jsonl', 'csv', 'sqlite')
+        batch_size: Registros máximos por escritura
+        flush_interval: Segundos máximos que un registro espera en la cola
+        max_queue: Registros en cola a partir de los cuales `write()` espera
+        rotate_bytes: Tamaño a partir del cual se rota el archivo (0 = nunca)
+        rotate_daily: Si True, se rota al cambiar el día
+        compress: Solo jsonl: escribir gzip (se añade '.gz' a la ruta si falta)
+    """
+
+    def __init__(self, path, fmt="jsonl", batch_size=100, flush_interval=1.0, max_queue=10000,
+                 rotate_bytes=0, rotate_daily=False, compress=False):
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato de salida desconocido: {fmt} (disponibles: {', '.join(FORMATS)})")
+        if compress and fmt == "jsonl" and not path.endswith(".gz"):
+            path += ".gz"
+        self.path = path
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_daily = rotate_daily
+        self.count = 0
+        self.written = 0
+        self.batches = 0
+        self.rotations = 0
+        self.errors = 0
+        self._compress = compress
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._output = self._open()
+        self._day = datetime.now().date()
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls, suffix=None):
+        """
+        Crea el escritor configurado en .env (OUTPUT_FORMAT, OUTPUT_PATH, OUTPUT_ROTATE_*...)
+
+        Args:
+            suffix: Si se indica, se inserta en el nombre del archivo
+                (resultados.<suffix>.jsonl): cada proceso que escribe a la vez
+                necesita su propio archivo, o se mezclarían los miembros gzip y
+                las rotaciones
+        """
+        fmt = os.getenv("OUTPUT_FORMAT", "jsonl").lower()
+        path = os.getenv("OUTPUT_PATH")
+        if not path:
+            path = (os.getenv("OUTPUT_JSONL", "output/resultados.jsonl") if fmt == "jsonl"
+                    else f"output/resultados{getattr(FORMATS.get(fmt), 'extension', '')}")
+        if suffix:
+            path = rotated_path(path, suffix)
+        return cls(
+            path,
+            fmt=fmt,
+            batch_size=int(os.getenv("OUTPUT_BATCH_SIZE", "100")),
+            flush_interval=float(os.getenv("OUTPUT_FLUSH_INTERVAL", "1")),
+            max_queue=int(os.getenv("OUTPUT_QUEUE_SIZE", "10000")),
+            rotate_bytes=int(float(os.getenv("OUTPUT_ROTATE_MB", "0")) * 1024 * 1024),
+            rotate_daily=os.getenv("OUTPUT_ROTATE_DAILY", "false").lower() == "true",
+            compress=os.getenv("OUTPUT_GZIP", "false").lower() == "true",
+        )
+
+    def _open(self):
+        if self.fmt == "jsonl":
+            return JsonlFormat(self.path, compress=self._compress)
+        return FORMATS[self.fmt](self.path)
+
+    def write(self, record):
+        """Encola un registro (espera si la cola está llena)"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("El escritor de resultados está cerrado")
+            self.count += 1
+        self._queue.put(record)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+        self._output.close()
+
+    def _write(self, batch):
+        try:
+            self._maybe_rotate()
+            self._output.write_batch(batch)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.errors += 1
+            logger.error("No se pudieron escribir %d resultados en %s: %s", len(batch), self.path, e)
+
+    def _maybe_rotate(self):
+        today = datetime.now().date()
+        if self.rotate_daily and today != self._day:
+            stamp = self._day.isoformat()
+        elif self.rotate_bytes and os.path.exists(self.path) and os.path.getsize(self.path) >= self.rotate_bytes:
+            stamp = datetime.now().strftime("%Y-%m-%dT%H%M%S")
+        else:
+            return
+        self._day = today
+        self._output.close()
+        target = rotated_path(self.path, stamp)
+        suffix = 1
+        while os.path.exists(target):
+            suffix += 1
+            target = rotated_path(self.path, f"{stamp}-{suffix}")
+        os.replace(self.path, target)
+        self.rotations += 1
+        logger.info("Salida rotada: %s", target)
+        self._output = self._open()
+
+    def close(self):
+        """Escribe lo pendiente y cierra el archivo"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
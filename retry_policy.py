@@ -0,0 +1,150 @@
+"""
+Reintentos de búsquedas: clasificación de fallos, espera exponencial con jitter
+y un circuit breaker por buscador para dejar de insistir en el que nos bloquea
+"""
+import os
+import random
+import threading
+import time
+
+from selenium.common.exceptions import (InvalidSessionIdException, NoSuchWindowException,
+                                        TimeoutException, WebDriverException)
+from urllib3.exceptions import MaxRetryError, ProtocolError
+
+# Tipos de fallo de una búsqueda
+TIMEOUT = "timeout"
+BLOCKED = "blocked"
+SELECTOR_MISS = "selector_miss"
+DRIVER_CRASH = "driver_crash"
+UNKNOWN = "unknown"
+
+# Fallos que indican que el buscador nos está frenando (cuentan para el circuit breaker)
+ENGINE_FAILURES = {TIMEOUT, BLOCKED, SELECTOR_MISS}
+
+# Mensajes de WebDriver que significan que el navegador ya no responde
+_CRASH_MARKERS = ("chrome not reachable", "disconnected", "invalid session id",
+                  "session deleted", "target window already closed", "tab crashed")
+
+
+def classify_exception(exc):
+    """Clasifica una excepción de la búsqueda en TIMEOUT, DRIVER_CRASH o UNKNOWN"""
+    if isinstance(exc, TimeoutException):
+        return TIMEOUT
+    if isinstance(exc, (InvalidSessionIdException, NoSuchWindowException)):
+        return DRIVER_CRASH
+    # Si muere chromedriver, selenium no lanza WebDriverException sino el error de
+    # conexión de urllib3 (o el de Python) al hablar con él
+    if isinstance(exc, (MaxRetryError, ProtocolError, ConnectionError)):
+        return DRIVER_CRASH
+    if isinstance(exc, WebDriverException):
+        message = str(exc).lower()
+        if any(marker in message for marker in _CRASH_MARKERS):
+            return DRIVER_CRASH
+        if "timeout" in message or "timed out" in message:
+            return TIMEOUT
+    return UNKNOWN
+
+
+class Backoff:
+    """
+    Espera exponencial con jitter completo: aleatoria entre 0 y base·2^intento (máx. `cap`)
+
+    Args:
+        base: Segundos del primer reintento
+        cap: Segundos máximos de espera
+        max_attempts: Intentos totales (el primero incluido)
+    """
+
+    def __init__(self, base=1.0, cap=30.0, max_attempts=3):
+        self.base = base
+        self.cap = cap
+        self.max_attempts = max_attempts
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            base=float(os.getenv("RETRY_BASE_DELAY", "1")),
+            cap=float(os.getenv("RETRY_MAX_DELAY", "30")),
+            max_attempts=int(os.getenv("RETRY_MAX_ATTEMPTS", "3")),
+        )
+
+    def delay(self, attempt):
+        """Segundos a esperar antes del reintento número `attempt` (1 = primer reintento)"""
+        return random.uniform(0, min(self.cap, self.base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Deja de usar un buscador tras varios fallos seguidos
+
+    Cerrado: se usa normalmente. Tras `threshold` fallos seguidos se abre y no se
+    usa durante `cooldown` segundos; luego pasa a semiabierto y deja pasar una
+    sola búsqueda de prueba: si va bien se cierra, si falla se vuelve a abrir.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, engine, threshold=3, cooldown=300.0):
+        self.engine = engine
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True si se puede usar el buscador ahora"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self, kind):
+        """Anota un fallo; solo los de ENGINE_FAILURES cuentan para abrir el circuito"""
+        with self._lock:
+            if kind not in ENGINE_FAILURES:
+                # El buscador no tiene la culpa: la prueba no cuenta, se podrá repetir
+                self._trial_running = False
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+
+    def remaining(self):
+        """Segundos que faltan para volver a probar el buscador (0 si no está abierto)"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(engine):
+    """Circuit breaker compartido por el proceso para `engine`"""
+    with _breakers_lock:
+        if engine not in _breakers:
+            _breakers[engine] = CircuitBreaker(
+                engine,
+                threshold=int(os.getenv("BREAKER_THRESHOLD", "3")),
+                cooldown=float(os.getenv("BREAKER_COOLDOWN", "300")),
+            )
+        return _breakers[engine]
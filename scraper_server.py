@@ -0,0 +1,199 @@
+"""
+Servidor HTTP local (TCP o socket Unix) para hacer búsquedas con navegadores ya abiertos
+
+API:
+    POST /search   {"query": "...", "engine": "bing", "max_pages": 1, "use_cache": true}
+                   → 200 con el mismo JSON que search_google_news
+                   → 404 si no hubo resultados, 400 si la petición es inválida
+                     (buscador desconocido, max_pages no entero o fuera de rango...),
+                     503 si la cola está llena o el servidor se está cerrando
+    GET  /health   → {"status": "ok" | "draining", "active": n, "queued": n}
+
+Las peticiones esperan en una cola acotada hasta que haya un navegador libre
+(como mucho `concurrency` búsquedas a la vez). Con SIGTERM/SIGINT deja de
+aceptar peticiones, termina las que están en curso o en cola y se cierra.
+"""
+import json
+import logging
+import os
+import signal
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    # Hilos no-daemon: server_close() espera a que se envíen las últimas respuestas
+    daemon_threads = False
+
+
+def validate_request(request, engines=None, max_pages_limit=10):
+    """
+    Comprueba los campos de una petición de búsqueda. Lanza ValueError si no es válida
+
+    Args:
+        engines: Buscadores admitidos en 'engine' (None = cualquiera)
+        max_pages_limit: Valor máximo de 'max_pages'
+    """
+    if not isinstance(request, dict):
+        raise ValueError("La petición debe ser un objeto JSON")
+    query = request.get("query")
+    if not isinstance(query, str) or not query.strip():
+        raise ValueError("Falta el campo 'query'")
+    engine = request.get("engine")
+    if engine is not None and (not isinstance(engine, str) or (engines and engine.lower() not in engines)):
+        raise ValueError(f"Buscador desconocido: {engine!r}"
+                         + (f" (disponibles: {', '.join(engines)})" if engines else ""))
+    max_pages = request.get("max_pages")
+    if max_pages is not None and (isinstance(max_pages, bool) or not isinstance(max_pages, int)
+                                  or not 1 <= max_pages <= max_pages_limit):
+        raise ValueError(f"'max_pages' debe ser un entero entre 1 y {max_pages_limit}")
+    if not isinstance(request.get("use_cache", True), bool):
+        raise ValueError("'use_cache' debe ser true o false")
+
+
+class SearchServer:
+    """
+    Args:
+        handler: Función (petición: dict) -> resultado (dict) o None
+        concurrency: Búsquedas simultáneas (normalmente el tamaño del pool)
+        queue_size: Peticiones que pueden esperar turno; las demás reciben 503
+        request_timeout: Segundos máximos de espera en la cola
+        engines: Buscadores admitidos en las peticiones (None = cualquiera)
+        max_pages_limit: Páginas máximas que puede pedir una petición
+    """
+
+    def __init__(self, handler, concurrency, queue_size=32, request_timeout=120, engines=None,
+                 max_pages_limit=10):
+        self.handler = handler
+        self.queue_size = queue_size
+        self.request_timeout = request_timeout
+        self.engines = engines
+        self.max_pages_limit = max_pages_limit
+        self.draining = False
+        self.active = 0
+        self.queued = 0
+        self._slots = threading.Semaphore(concurrency)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._httpd = None
+
+    def status(self):
+        with self._lock:
+            return {
+                "status": "draining" if self.draining else "ok",
+                "active": self.active,
+                "queued": self.queued,
+            }
+
+    def submit(self, request):
+        """
+        Ejecuta una petición respetando la cola y el límite de concurrencia
+
+        Returns:
+            (código HTTP, cuerpo de la respuesta)
+        """
+        with self._lock:
+            if self.draining:
+                return 503, {"error": "El servidor se está cerrando"}
+            if self.queued >= self.queue_size:
+                return 503, {"error": "Cola llena, inténtalo más tarde"}
+            self.queued += 1
+        acquired = self._slots.acquire(timeout=self.request_timeout)
+        with self._lock:
+            self.queued -= 1
+            if acquired:
+                self.active += 1
+            self._idle.notify_all()
+        if not acquired:
+            return 503, {"error": "Tiempo de espera en cola agotado"}
+        try:
+            result = self.handler(request)
+        except Exception as e:
+            logger.exception("Error atendiendo la petición")
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            self._slots.release()
+            with self._lock:
+                self.active -= 1
+                self._idle.notify_all()
+        if result is None:
+            return 404, {"error": "No se obtuvieron resultados"}
+        return 200, result
+
+    def drain(self):
+        """Deja de aceptar peticiones, espera a las pendientes y detiene el servidor"""
+        with self._lock:
+            if self.draining:
+                return
+            self.draining = True
+            logger.info("Cerrando: esperando %d en curso y %d en cola...", self.active, self.queued)
+            while self.active or self.queued:
+                self._idle.wait()
+        if self._httpd:
+            self._httpd.shutdown()
+
+    def serve_forever(self, host="127.0.0.1", port=8765, unix_socket=None):
+        """Atiende peticiones hasta recibir SIGTERM/SIGINT (y terminar las pendientes)"""
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                logger.info("HTTP " + fmt, *args)
+
+            def address_string(self):
+                return self.client_address[0] if self.client_address else "unix"
+
+            def _reply(self, code, body):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/health":
+                    self._reply(200, server.status())
+                else:
+                    self._reply(404, {"error": "Ruta desconocida"})
+
+            def do_POST(self):
+                if self.path != "/search":
+                    self._reply(404, {"error": "Ruta desconocida"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                    validate_request(request, server.engines, server.max_pages_limit)
+                except ValueError as e:
+                    self._reply(400, {"error": str(e)})
+                    return
+                self._reply(*server.submit(request))
+
+        if unix_socket:
+            if os.path.exists(unix_socket):
+                os.unlink(unix_socket)
+            self._httpd = _ThreadingUnixHTTPServer(unix_socket, _Handler)
+            where = f"unix:{unix_socket}"
+        else:
+            self._httpd = ThreadingHTTPServer((host, port), _Handler)
+            self._httpd.daemon_threads = False
+            where = f"http://{host}:{port}"
+
+        def _on_signal(signum, frame):
+            # shutdown() bloquea hasta que serve_forever termina: hacerlo en otro hilo
+            threading.Thread(target=self.drain, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, _on_signal)
+        signal.signal(signal.SIGINT, _on_signal)
+        logger.info("Servidor escuchando en %s", where)
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+            if unix_socket and os.path.exists(unix_socket):
+                os.unlink(unix_socket)
+        logger.info("Servidor detenido")
@@ -4,45 +4,186 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 from datetime import datetime
 import time
 import json
 import subprocess
 import logging
+import signal
+import socket
+import threading
 import sys
 import os
+from urllib.parse import urlencode, urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, TimeoutError as FuturesTimeout
 from dotenv import load_dotenv
+from lxml import html as lxml_html
+from diagnostics import get_diagnostics
+from driver_pool import DriverPool, driver_responds
+import metrics
+from browser_memory import (MIN_SHM_MB, dense_arguments, driver_memory_mb, launch_profile,
+                            pool_memory_options, shm_size_mb)
+from browser_profiles import ProfiledChrome, flag_driver, get_profile_pool, has_consent_cookie
+from http_fetch import get_fetcher
+from jsonl_sink import MemorySink
+from logging_setup import SUCCESS, setup_logging
+from merge_results import merge_ranked
+from result_writer import ResultWriter
+from extraction import extract_results, normalize_result
+from result_cache import get_cache
+from retry_policy import Backoff, get_breaker, classify_exception, BLOCKED, SELECTOR_MISS, DRIVER_CRASH
+from resource_blocking import apply_blocking, stats_enabled, enable_stats, collect_stats, format_stats
+from selector_strategy import get_strategy
+from scraper_server import SearchServer
+from work_queue import open_queue
+from serp_parser import parse_results
+from readiness import wait_page_settled, wait_results_ready, format_timings
 
 # Cargar variables de entorno desde .env
 load_dotenv()
 
-# Configurar logging detallado
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] %(levelname)-8s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+# Configurar logging (LOG_LEVEL, LOG_FORMAT, LOG_FILE; ver logging_setup.py)
+setup_logging()
 logger = logging.getLogger(__name__)
 
-def log_info(msg):
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
+
+# Selectores de resultados por buscador, en orden de preferencia
+# (apuntan a resultados reales, no a las pestañas de navegación)
+RESULT_SELECTORS = {
+    "google": [
+        ("div.g", "Contenedor de resultado div.g (estructura clásica)"),
+        ("div[data-sokoban-container]", "Contenedor Sokoban"),
+        ("div.Gvuyqe", "Div class Gvuyqe (moderna)"),
+        ("div[jscontroller][data-ved]", "Div con jscontroller y data-ved"),
+    ],
+    "bing": [
+        ("li.b_algo", "Elemento li.b_algo (estructura Bing)"),
+        ("div.b_algo", "Contenedor div.b_algo"),
+        ("li", "Elementos li genéricos"),
+    ],
+}
+
+# Portada de cada buscador; la página de resultados es <portada>/search?q=...
+# (GOOGLE_BASE_URL / BING_BASE_URL permiten apuntar a otro servidor, p. ej. replay_server.py)
+ENGINE_URLS = {
+    "google": (os.getenv("GOOGLE_BASE_URL") or "https://www.google.com").rstrip("/"),
+    "bing": (os.getenv("BING_BASE_URL") or "https://www.bing.com").rstrip("/"),
+}
+
+# Parámetro de paginación de cada buscador y su valor para la primera página
+# (Google: start=0, 10, 20...; Bing: first=1, 11, 21...)
+PAGE_PARAMS = {
+    "google": ("start", 0),
+    "bing": ("first", 1),
+}
+RESULTS_PER_PAGE = 10
+
+# Elementos que indican que la página de resultados ya empezó a cargarse
+RESULTS_PAGE_SELECTORS = {
+    "google": "div#search, a[data-ved]",
+    "bing": "ol#b_results, li.b_algo",
+}
+
+# Botón "Aceptar todo" del diálogo de cookies de Google, en orden de preferencia
+COOKIE_SELECTORS = [
+    (By.ID, "L2AGLb"),  # Selector por ID (más específico)
+    (By.XPATH, "//button[@id='L2AGLb']"),  # XPath por ID
+    (By.XPATH, "//button[.//div[contains(text(), 'Aceptar todo')]]"),  # XPath por contenido
+    (By.XPATH, "//button[contains(., 'Aceptar')]"),  # XPath flexible
+    (By.CSS_SELECTOR, "button.tHlp8d"),  # Por clase
+]
+
+# Señales de que el buscador nos ha bloqueado o pide CAPTCHA (las de la URL se
+# buscan solo en el host y la ruta: la búsqueda puede contener "captcha")
+BLOCK_URL_MARKERS = ("/sorry/", "captcha")
+BLOCK_PAGE_SELECTOR = "form#captcha-form, div#recaptcha, iframe[src*='recaptcha'], div#b_captcha"
+# Códigos HTTP con los que el buscador rechaza peticiones sin navegador
+HTTP_BLOCK_STATUS = (403, 429, 503)
+
+# Contenedor principal de resultados (no incluye tabs de navegación), en orden
+CONTAINER_SELECTORS = {
+    "google": [
+        "div#search",  # Contenedor principal de resultados
+        "div#center_col",  # Columna central
+        "div[role='main']",  # Área principal
+    ],
+    "bing": [
+        "ol#b_results",  # Lista ordenada de resultados
+        "div#b_results",  # Contenedor alternativo
+        "div[role='main']",  # Área principal
+    ],
+}
+
+# El título puede estar en h3, h2, o directamente en el div
+TITLE_SELECTORS = {
+    "google": [
+        (By.CSS_SELECTOR, "h3"),
+        (By.CSS_SELECTOR, "h2"),
+        (By.XPATH, ".//div[@role='heading']"),
+        (By.XPATH, ".//span[@role='heading']"),
+    ],
+    "bing": [
+        (By.CSS_SELECTOR, "h2"),  # En Bing es h2
+        (By.CSS_SELECTOR, "h3"),
+        (By.XPATH, ".//a"),  # El link en Bing contiene el título
+    ],
+}
+
+# Descripción/snippet de cada resultado
+SNIPPET_SELECTORS = {
+    "google": [
+        (By.CSS_SELECTOR, "span.VwiC3b"),  # Selector moderno
+        (By.CSS_SELECTOR, "div.s"),  # Selector antiguo
+        (By.CSS_SELECTOR, "span.s"),
+        (By.XPATH, ".//div[@role='cell']//span"),
+        (By.XPATH, ".//div[contains(@class, 'snippet') or contains(@class, 'description')]"),
+        (By.XPATH, ".//span[contains(@class, 'preview')]"),
+    ],
+    "bing": [
+        (By.CSS_SELECTOR, "p"),  # En Bing es generalmente un párrafo
+        (By.CSS_SELECTOR, "div.b_caption"),
+        (By.XPATH, ".//div[contains(@class, 'snippet')]"),
+    ],
+}
+
+# Selectores que selector_strategy.py deja siempre al final de su cascada: los que
+# aciertan en casi cualquier página y 'button.tHlp8d', que también es la clase del
+# botón "Rechazar todo" (va antes en la página y se pulsaría ese)
+CATCH_ALL_SELECTORS = frozenset({
+    "div[role='main']",
+    "li",
+    ".//a",
+    "button.tHlp8d",
+})
+
+# Evita que varias búsquedas concurrentes (modo batch) escriban el JSON a la vez
+_output_lock = threading.Lock()
+
+def log_debug(msg, *args):
+    """Log de detalle (pasos intermedios; solo con LOG_LEVEL=DEBUG)"""
+    logger.debug(msg, *args)
+
+def log_info(msg, *args):
     """Log de información"""
-    print(f"\n[INFO] {msg}")
-    logger.info(msg)
+    logger.info(msg, *args)
 
-def log_success(msg):
+def log_success(msg, *args):
     """Log de éxito"""
-    print(f"[✓ OK] {msg}")
-    logger.info(f"SUCCESS: {msg}")
+    logger.log(SUCCESS, msg, *args)
 
-def log_warning(msg):
+def log_warning(msg, *args):
     """Log de advertencia"""
-    print(f"[⚠️  WARNING] {msg}")
-    logger.warning(msg)
+    logger.warning(msg, *args)
 
-def log_error(msg):
+def log_error(msg, *args):
     """Log de error"""
-    print(f"[❌ ERROR] {msg}")
-    logger.error(msg)
+    logger.error(msg, *args)
+
+def log_exception(msg, *args):
+    """Log de error con el traceback de la excepción que se está tratando"""
+    logger.exception(msg, *args)
 
 def check_docker_running():
     """Verifica si Docker está corriendo (solo en modo host)"""
@@ -61,7 +202,7 @@ def check_docker_running():
             return True
         else:
             error_msg = result.stderr.decode('utf-8', errors='ignore').strip() if result.stderr else "Error desconocido"
-            log_error(f"Error de Docker: {error_msg}")
+            log_error("Error de Docker: %s", error_msg)
             return False
     except subprocess.TimeoutExpired:
         log_error("Docker no respondió en 5 segundos - podría no estar activo")
@@ -70,436 +211,1079 @@ def check_docker_running():
         log_error("Docker no está instalado o no está en el PATH")
         return False
     except Exception as e:
-        log_error(f"No se pudo verificar Docker: {e}")
+        log_error("No se pudo verificar Docker: %s", e)
         return False
 
-def search_google_news(search_query, retry_count=0, headless=None, search_engine=None):
-    """
-    Busca en Google o Bing y extrae el contenido del primer resultado sin entrar
-    
-    Args:
-        search_query: Término de búsqueda
-        retry_count: Contador interno de reintentos
-        headless: Si True, ejecuta sin ventana visible (más rápido). Si None, lee del .env
-        search_engine: 'google' o 'bing'. Si None, lee del .env
-    """
-    
-    # Usar configuración del .env si no se proporciona explícitamente
-    if search_engine is None:
-        search_engine = os.getenv("SEARCH_ENGINE", "bing").lower()
-    if headless is None:
-        headless = os.getenv("HEADLESS", "true").lower() == "true"
-    
-    log_info(f"Iniciando búsqueda: '{search_query}'")
-    log_info(f"Motor de búsqueda: {search_engine.upper()}")
-    log_info(f"Intento {retry_count + 1}")
-    
-    # Verificar que Docker está corriendo (o que estamos en un contenedor)
-    if not check_docker_running():
-        log_error("No se pudo verificar el entorno Docker")
-        return None
-    
-    log_info("Configurando opciones de Chrome/Chromium...")
+def build_chrome_options(headless=True):
+    """Construye las opciones de Chrome/Chromium usadas por el scraper"""
+    log_debug("Configurando opciones de Chrome/Chromium...")
     
     # Configurar opciones de Chrome
     chrome_options = Options()
     
     if headless:
         chrome_options.add_argument("--headless")  # Modo sin interfaz gráfica
-        log_info("  ✓ Modo headless activado (sin ventana visual)")
+        log_debug("  ✓ Modo headless activado (sin ventana visual)")
     else:
         log_warning("  ⚠️  MODO INTERACTIVO - Ventana visible (más lento)")
         log_warning("  ⚠️  El navegador será visible para debugging")
     
     chrome_options.add_argument("--no-sandbox")
-    log_info("  ✓ Sandbox deshabilitado")
+    log_debug("  ✓ Sandbox deshabilitado")
     
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    log_info("  ✓ /dev/shm deshabilitado")
+    # Perfil dense: /dev/shm solo se evita si es demasiado pequeño para Chromium
+    dense = launch_profile() == "dense"
+    if not dense or shm_size_mb() < MIN_SHM_MB:
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        log_debug("  ✓ /dev/shm deshabilitado")
     
     chrome_options.add_argument("--disable-gpu")
-    log_info("  ✓ GPU deshabilitada")
+    log_debug("  ✓ GPU deshabilitada")
     
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    log_info("  ✓ Características de automatización deshabilitadas")
+    log_debug("  ✓ Características de automatización deshabilitadas")
     
-    chrome_options.add_argument("--start-maximized")
+    if dense:
+        for argument in dense_arguments():
+            chrome_options.add_argument(argument)
+        log_debug("  ✓ Perfil de bajo consumo (dense): ventana fija, un renderizador, caché y heap limitados")
+    else:
+        chrome_options.add_argument("--start-maximized")
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
-    log_info("  ✓ Opciones anti-detección de bots aplicadas")
+    log_debug("  ✓ Opciones anti-detección de bots aplicadas")
     
-    chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36")
-    log_info("  ✓ User-Agent realista configurado")
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
+    log_debug("  ✓ User-Agent realista configurado")
     
-    driver = None
+    if stats_enabled():
+        enable_stats(chrome_options)
+        log_debug("  ✓ Log de rendimiento activado (estadísticas de red)")
     
-    try:
-        log_info("Inicializando navegador Chrome/Chromium...")
-        driver = webdriver.Chrome(options=chrome_options)
+    return chrome_options
+
+def create_driver(headless=True):
+    """Inicia un navegador Chrome/Chromium nuevo (con un perfil persistente si PROFILES_ENABLED=true)"""
+    log_debug("Inicializando navegador Chrome/Chromium...")
+    options = build_chrome_options(headless)
+    profiles = get_profile_pool()
+    if profiles:
+        profile = profiles.acquire()
+        log_debug("  ✓ Perfil del navegador: %s", profile.path)
+        try:
+            driver = ProfiledChrome(profile, options)
+        except Exception:
+            profile.release()
+            raise
+    else:
+        driver = webdriver.Chrome(options=options)
+    memory_mb = driver_memory_mb(driver)
+    if memory_mb is not None:
+        log_success("Navegador iniciado correctamente (%.0f MB)", memory_mb)
+    else:
         log_success("Navegador iniciado correctamente")
+    return driver
+
+def accept_cookies(driver, search_engine):
+    """Acepta el diálogo de cookies si aparece (solo para Google)"""
+    if search_engine != "google":
+        return
+    with metrics.span("cookies"):
+        # Con el perfil persistente el consentimiento ya suele estar dado
+        try:
+            consent_given = has_consent_cookie(driver.get_cookies(), search_engine)
+        except Exception:
+            consent_given = False
+        if consent_given:
+            log_debug("Consentimiento de cookies ya guardado en el perfil, se omite el diálogo")
+            return
+        log_debug("Buscando diálogo de cookies...")
+        _click_cookie_button(driver, search_engine)
+
+def _click_cookie_button(driver, search_engine):
+    """Pulsa el primer botón de COOKIE_SELECTORS que aparezca (una sola espera para todos)"""
+    # Los selectores empiezan por el que funcionó la última vez
+    strategy = get_strategy()
+    selectors = strategy.order(search_engine, "cookie", COOKIE_SELECTORS, pinned=CATCH_ALL_SELECTORS)
+    
+    def _first_clickable(d):
+        for selector_type, selector_value in selectors:
+            for element in d.find_elements(selector_type, selector_value):
+                if element.is_displayed() and element.is_enabled():
+                    return selector_value, element
+        return False
+    
+    try:
+        try:
+            selector_value, accept_button = WebDriverWait(
+                driver, 3, ignored_exceptions=(StaleElementReferenceException,)
+            ).until(_first_clickable)
+        except TimeoutException:
+            log_debug("  → No se encontró botón de cookies")
+            metrics.record_selector("cookie", None)
+            return
+        log_debug("    ✓ Botón de cookies encontrado con selector: %s", selector_value)
+        metrics.record_selector("cookie", selector_value)
+        strategy.record(search_engine, "cookie", selector_value, CATCH_ALL_SELECTORS)
         
-        # Acceder al buscador correspondiente
-        if search_engine == "google":
-            log_info("Accediendo a https://www.google.com...")
-            driver.get("https://www.google.com")
-            log_success("Google cargado correctamente")
-            search_field_name = "q"
-        elif search_engine == "bing":
-            log_info("Accediendo a https://www.bing.com...")
-            driver.get("https://www.bing.com")
-            log_success("Bing cargado correctamente")
-            search_field_name = "q"
-        else:
-            log_error(f"Motor de búsqueda desconocido: {search_engine}")
-            return None
-        
-        log_info("Esperando a que la página se estabilice (2 segundos)...")
-        time.sleep(2)
-        
-        # Aceptar cookies si aparece el aviso (solo para Google)
-        if search_engine == "google":
-            log_info("Buscando diálogo de cookies...")
-            try:
-                accept_button = None
-                
-                # Intentar varios selectores para encontrar el botón de cookies
-                selectores = [
-                    (By.ID, "L2AGLb"),  # Selector por ID (más específico)
-                    (By.XPATH, "//button[@id='L2AGLb']"),  # XPath por ID
-                    (By.XPATH, "//button[.//div[contains(text(), 'Aceptar todo')]]"),  # XPath por contenido
-                    (By.XPATH, "//button[contains(., 'Aceptar')]"),  # XPath flexible
-                    (By.CSS_SELECTOR, "button.tHlp8d"),  # Por clase
-                ]
-                
-                for selector_type, selector_value in selectores:
-                    try:
-                        log_info(f"  → Intentando selector: {selector_value}")
-                        accept_button = WebDriverWait(driver, 3).until(
-                            EC.element_to_be_clickable((selector_type, selector_value))
-                        )
-                        log_success(f"    ✓ Botón de cookies encontrado con selector: {selector_value}")
-                        break
-                    except:
-                        continue
-                
-                if accept_button:
-                    log_info("  → Haciendo click en botón de cookies...")
-                    accept_button.click()
-                    log_success("Cookies aceptadas")
-                    time.sleep(2)
-                else:
-                    log_info("  → No se encontró botón de cookies")
-            except Exception as e:
-                log_warning(f"No se pudo aceptar cookies: {e}")
+        log_debug("  → Haciendo click en botón de cookies...")
+        accept_button.click()
+        log_success("Cookies aceptadas")
+        timings = wait_page_settled(driver, search_engine)
+        log_debug("  → Página estable tras cookies (%s)", format_timings(timings))
+    except Exception as e:
+        log_warning("No se pudo aceptar cookies: %s", e)
+
+def build_search_url(search_query, search_engine, page=1):
+    """Construye la URL de resultados del buscador, p. ej. https://www.bing.com/search?q=..."""
+    params = {"q": search_query}
+    if page > 1:
+        param, first = PAGE_PARAMS[search_engine]
+        params[param] = first + (page - 1) * RESULTS_PER_PAGE
+    return f"{ENGINE_URLS[search_engine]}/search?{urlencode(params)}"
+
+def is_block_url(url):
+    """True si el host o la ruta de `url` son de una página de bloqueo (p. ej. google.com/sorry/)"""
+    parts = urlsplit(url.lower())
+    return any(marker in parts.netloc + parts.path for marker in BLOCK_URL_MARKERS)
+
+def is_blocked(driver):
+    """Detecta páginas de bloqueo/CAPTCHA (p. ej. google.com/sorry/)"""
+    try:
+        if is_block_url(driver.current_url):
+            return True
+        return bool(driver.find_elements(By.CSS_SELECTOR, BLOCK_PAGE_SELECTOR))
+    except Exception:
+        return False
+
+def wait_for_results(driver, search_engine):
+    """Espera a que los resultados terminen de renderizarse. Devuelve True si se estabilizaron"""
+    log_debug("Esperando a que los resultados terminen de renderizarse...")
+    with metrics.span("results_wait"):
+        stable, timings = wait_results_ready(
+            driver, search_engine, [selector for selector, _ in RESULT_SELECTORS[search_engine]]
+        )
+    if stable:
+        log_debug("Resultados estables (%s)", format_timings(timings))
+    else:
+        log_warning("Los resultados no se estabilizaron, continuando (%s)", format_timings(timings))
+    return stable
+
+def navigate_direct(driver, search_query, search_engine):
+    """
+    Carga directamente la página de resultados, sin pasar por la portada
+    
+    Returns:
+        True si hay resultados; False si la página está bloqueada o vacía
+        (en ese caso conviene recurrir a navigate_form)
+    """
+    url = build_search_url(search_query, search_engine)
+    log_info("Accediendo directamente a los resultados: %s", url)
+    with metrics.span("direct_load"):
+        driver.get(url)
+    accept_cookies(driver, search_engine)
+    
+    if is_blocked(driver):
+        log_warning("Página de bloqueo detectada: %s", driver.current_url)
+        return False
+    return wait_for_results(driver, search_engine)
+
+def navigate_form(driver, search_query, search_engine):
+    """Carga la portada del buscador, escribe la búsqueda en el campo 'q' y la envía"""
+    home_url = ENGINE_URLS[search_engine]
+    log_info("Accediendo a %s...", home_url)
+    with metrics.span("home_load"):
+        driver.get(home_url)
+        log_debug("%s cargado correctamente", search_engine.capitalize())
         
-        # Buscar y llenar campo de búsqueda
-        log_info("Buscando campo de búsqueda...")
+        log_debug("Esperando a que la página se estabilice...")
+        timings = wait_page_settled(driver, search_engine)
+        log_debug("Página estable (%s)", format_timings(timings))
+    
+    accept_cookies(driver, search_engine)
+    
+    # Buscar y llenar campo de búsqueda
+    with metrics.span("search_submit"):
+        log_debug("Buscando campo de búsqueda...")
         wait = WebDriverWait(driver, 15)
-        search_box = wait.until(EC.presence_of_element_located((By.NAME, search_field_name)))
-        log_success("Campo de búsqueda encontrado")
+        search_box = wait.until(EC.presence_of_element_located((By.NAME, "q")))
+        log_debug("Campo de búsqueda encontrado")
         
-        log_info(f"Escribiendo búsqueda: '{search_query}'...")
+        log_debug("Escribiendo búsqueda: '%s'...", search_query)
         search_box.send_keys(search_query)
-        log_success("Texto ingresado en el campo de búsqueda")
+        log_debug("Texto ingresado en el campo de búsqueda")
         
-        log_info("Presionando Enter para buscar...")
+        log_debug("Presionando Enter para buscar...")
         search_box.submit()
-        log_success("Búsqueda iniciada")
-        
-        log_info("Esperando a que carguen los resultados (esto puede tardar)...")
-        # Esperar a que los resultados se carguen según el buscador
-        if search_engine == "google":
-            # Google renderiza los resultados dinámicamente, esperar más tiempo
-            try:
-                wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div#search, a[data-ved]")))
-                log_success("Página de resultados detectada")
-            except:
-                log_warning("Timeout esperando selectores principales, continuando...")
-        elif search_engine == "bing":
-            # Bing usa diferentes selectores
-            try:
-                wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "ol#b_results, li.b_algo")))
-                log_success("Página de resultados detectada")
-            except:
-                log_warning("Timeout esperando selectores principales, continuando...")
-        
-        log_info("Esperando 5 segundos para que se renderice completamente...")
-        time.sleep(5)
-        
-        # Buscar el contenedor principal de resultados (no incluye tabs de navegación)
-        log_info("Buscando contenedor de resultados...")
-        results_container = None
-        
-        if search_engine == "google":
-            contenedor_selectores = [
-                "div#search",  # Contenedor principal de resultados
-                "div#center_col",  # Columna central
-                "div[role='main']",  # Área principal
-            ]
-        elif search_engine == "bing":
-            contenedor_selectores = [
-                "ol#b_results",  # Lista ordenada de resultados
-                "div#b_results",  # Contenedor alternativo
-                "div[role='main']",  # Área principal
-            ]
-        
-        for selector in contenedor_selectores:
-            try:
-                results_container = driver.find_element(By.CSS_SELECTOR, selector)
-                log_success(f"Contenedor encontrado: {selector}")
-                break
-            except:
-                pass
-        
-        if not results_container:
-            log_warning("No se encontró contenedor específico, usando toda la página")
-            results_container = driver.find_element(By.TAG_NAME, "body")
-        
-        # Extraer primer resultado - intentar varios selectores en orden de preferencia
-        log_info("Buscando resultados dentro del contenedor...")
-        results = []
-        
-        # Intentar selectores en este orden (apuntando a resultados reales, no tabs)
-        if search_engine == "google":
-            selectores = [
-                ("div.g", "Contenedor de resultado div.g (estructura clásica)"),
-                ("div[data-sokoban-container]", "Contenedor Sokoban"),
-                ("div.Gvuyqe", "Div class Gvuyqe (moderna)"),
-                ("div[jscontroller][data-ved]", "Div con jscontroller y data-ved"),
-            ]
-        elif search_engine == "bing":
-            selectores = [
-                ("li.b_algo", "Elemento li.b_algo (estructura Bing)"),
-                ("div.b_algo", "Contenedor div.b_algo"),
-                ("li", "Elementos li genéricos"),
-            ]
+        log_debug("Búsqueda iniciada")
+    
+    log_debug("Esperando a que carguen los resultados (esto puede tardar)...")
+    # Esperar a que los resultados se carguen según el buscador
+    with metrics.span("results_wait"):
+        try:
+            wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, RESULTS_PAGE_SELECTORS[search_engine])))
+            log_debug("Página de resultados detectada")
+        except:
+            log_warning("Timeout esperando selectores principales, continuando...")
+    
+    return wait_for_results(driver, search_engine)
+
+def _selector_tables(search_engine):
+    """Cascadas de selectores del buscador, empezando por las que acertaron más recientemente"""
+    strategy = get_strategy()
+    return (
+        strategy.order(search_engine, "container", CONTAINER_SELECTORS[search_engine],
+                       pinned=CATCH_ALL_SELECTORS),
+        [selector for selector, _ in strategy.order(search_engine, "results", RESULT_SELECTORS[search_engine],
+                                                    key=lambda s: s[0], pinned=CATCH_ALL_SELECTORS)],
+        strategy.order(search_engine, "title", TITLE_SELECTORS[search_engine], pinned=CATCH_ALL_SELECTORS),
+        strategy.order(search_engine, "snippet", SNIPPET_SELECTORS[search_engine], pinned=CATCH_ALL_SELECTORS),
+    )
+
+def _report_extraction(search_engine, extraction):
+    """Anota métricas y selectores ganadores de una extracción y devuelve sus resultados"""
+    metrics.record_extraction(extraction)
+    get_strategy().record_extraction(search_engine, extraction, CATCH_ALL_SELECTORS)
+    results = extraction["results"]
+    
+    if extraction["container_selector"]:
+        log_debug("Contenedor encontrado: %s", extraction["container_selector"])
+    else:
+        log_warning("No se encontró contenedor específico, usando toda la página")
+    if results:
+        descripcion = dict(RESULT_SELECTORS[search_engine])[extraction["result_selector"]]
+        log_debug("Encontrados %d elementos con %s", len(results), descripcion)
+    log_debug("  → Extracción en %.0f ms", extraction["elapsed_ms"])
+    return results
+
+def extract_page(driver, search_engine):
+    """
+    Extrae los resultados crudos de la página de resultados cargada
+    
+    Con EXTRACTION_MODE=js (por defecto) la cascada de selectores se ejecuta en
+    el navegador; con EXTRACTION_MODE=html se descarga page_source una vez y se
+    analiza con lxml, dejando el navegador libre en cuanto llega el HTML.
+    """
+    selector_tables = _selector_tables(search_engine)
+    if os.getenv("EXTRACTION_MODE", "js").lower() == "html":
+        log_debug("Extrayendo resultados del HTML de la página...")
+        with metrics.span("page_source"):
+            page_url, page_html = driver.current_url, driver.page_source
+        extraction = parse_results(page_html, *selector_tables, base_url=page_url)
+    else:
+        # Extraer todos los candidatos en el navegador con una sola llamada:
+        # contenedor → resultados (descartando tabs) → título/URL/descripción
+        log_debug("Extrayendo resultados de la página...")
+        extraction = extract_results(driver, *selector_tables)
+        metrics.add_phase("extraction_roundtrip", extraction["elapsed_ms"])
+    return _report_extraction(search_engine, extraction)
+
+def fetch_results_http(search_query, search_engine, page=1):
+    """
+    Descarga y analiza una página de resultados con HTTP, sin navegador
+    
+    Returns:
+        (resultados crudos, None), o ([], 'blocked' | 'selector_miss') si hay
+        que recurrir al navegador
+    """
+    url = build_search_url(search_query, search_engine, page)
+    log_info("Descargando resultados sin navegador: %s", url)
+    fetcher = get_fetcher(USER_AGENT, timeout=float(os.getenv("HTTP_TIMEOUT", "10")),
+                          pool_size=int(os.getenv("POOL_SIZE", "0")) or os.cpu_count() or 1)
+    with metrics.span("http_fetch"):
+        status_code, final_url, page_html = fetcher.get(url, referer=ENGINE_URLS[search_engine] + "/")
+    if status_code in HTTP_BLOCK_STATUS or is_block_url(final_url):
+        log_warning("Respuesta de bloqueo por HTTP (%s): %s", status_code, final_url)
+        return [], BLOCKED
+    if status_code != 200 or not page_html.strip():
+        log_warning("Respuesta HTTP inesperada (%s): %s", status_code, final_url)
+        return [], SELECTOR_MISS
+    
+    extraction = parse_results(page_html, *_selector_tables(search_engine), base_url=final_url)
+    results = _report_extraction(search_engine, extraction)
+    if results:
+        return results, None
+    kind = BLOCKED if lxml_html.fromstring(page_html).cssselect(BLOCK_PAGE_SELECTOR) else SELECTOR_MISS
+    diagnostics = get_diagnostics()
+    if diagnostics:
+        diagnostics.capture_html(page_html, final_url, f"http_{kind}", search_engine, search_query)
+    return [], kind
+
+def load_results_page(driver, search_query, search_engine, page):
+    """Carga la página `page` (>1) de resultados y extrae sus resultados. Lista vacía si no hay"""
+    url = build_search_url(search_query, search_engine, page)
+    log_debug("Cargando página %d de resultados: %s", page, url)
+    with metrics.span("next_page_load"):
+        driver.get(url)
+    if is_blocked(driver):
+        log_warning("Página de bloqueo detectada: %s", driver.current_url)
+        return []
+    if not wait_for_results(driver, search_engine):
+        return []
+    return extract_page(driver, search_engine)
+
+def verbose_output():
+    """True si VERBOSE_OUTPUT=true: resumen de cada búsqueda y JSON completo en consola"""
+    return os.getenv("VERBOSE_OUTPUT", "false").lower() == "true"
+
+def save_result_json(result_data, output_file="output/resultado_busqueda.json"):
+    """
+    Guarda el resultado (formateado) en output/resultado_busqueda.json
+    
+    Solo lo usan las ejecuciones de una búsqueda desde la línea de comandos; los
+    modos batch, servicio y cola escriben únicamente en el ResultWriter.
+    """
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    with _output_lock:
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(result_data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, output_file)
+    log_success("Archivo guardado en: %s", output_file)
+
+def capture_failure(driver, reason, search_engine, search_query):
+    """Guarda (en segundo plano) el HTML de la página actual en output/debug/ para diagnóstico"""
+    diagnostics = get_diagnostics()
+    if diagnostics is None:
+        return
+    with metrics.span("debug_capture"):
+        if diagnostics.capture(driver, reason, search_engine, search_query):
+            log_debug("Página guardada para diagnóstico (%s)", reason)
+
+def _pick_engine(preferred, failover=True):
+    """Buscador a usar: `preferred` si su circuit breaker lo permite; si no, otro que lo permita"""
+    candidates = [preferred]
+    if failover:
+        candidates += [engine for engine in ENGINE_URLS if engine != preferred]
+    for engine in candidates:
+        if get_breaker(engine).allow():
+            return engine
+    return None
+
+def _other_engine(engine):
+    """Siguiente buscador de ENGINE_URLS después de `engine`"""
+    engines = list(ENGINE_URLS)
+    return engines[(engines.index(engine) + 1) % len(engines)]
+
+def _collect_results(search_query, search_engine, results, next_page, max_pages, sink, via):
+    """
+    Numera los resultados página a página y, cuando se han cargado todas, los
+    envía al sink: si falla una página posterior, el reintento no duplica las
+    anteriores en la salida
+    
+    Args:
+        results: Resultados crudos de la primera página
+        next_page: Función (número de página) -> resultados crudos de esa página
+        via: 'http' o 'browser', según cómo se obtuvieron
+    
+    Returns:
+        Diccionario con el resultado de la búsqueda (el de search_google_news)
+    """
+    log_debug("Encontrados %d resultados de búsqueda", len(results))
+    first_result = results[0]
+    
+    timestamp = datetime.now().isoformat()
+    ranked = []
+    page = 1
+    while results:
+        for raw in results:
+            item = {"rank": len(ranked) + 1, "page": page, **normalize_result(raw)}
+            ranked.append(item)
+        log_debug("  → Página %d: %d resultados (total %d)", page, len(results), len(ranked))
+        if page >= max_pages:
+            break
+        page += 1
+        results = next_page(page)
+    
+    log_debug("Información del PRIMER resultado:")
+    title, url, snippet = ranked[0]["title"], ranked[0]["url"], ranked[0]["snippet"]
+    if first_result["title"]:
+        log_debug("    ✓ Título encontrado: '%s'", title)
+    else:
+        log_debug("    → No se encontró estructura estándar, extrayendo texto disponible...")
+    if first_result["url"]:
+        log_debug("    ✓ URL encontrada: '%s'", url)
+    if first_result["snippet"]:
+        log_debug("    ✓ Descripción encontrada")
+    
+    # Crear resultado
+    result_data = {
+        "timestamp": timestamp,
+        "search_query": search_query,
+        "engine": search_engine,
+        "via": via,
+        "result": {
+            "title": title,
+            "url": url,
+            "snippet": snippet
+        },
+        "results": ranked
+    }
+    
+    if verbose_output():
+        print(f"\n{'='*70}")
+        print(f"✅ BÚSQUEDA COMPLETADA EXITOSAMENTE")
+        print(f"{'='*70}")
+        print(f"📰 TÍTULO: {title}")
+        print(f"🔗 URL: {url}")
+        print(f"📝 DESCRIPCIÓN:\n{snippet}")
+        print(f"📚 TOTAL DE RESULTADOS: {len(ranked)} (en {ranked[-1]['page']} página/s)")
+        print(f"{'='*70}\n")
+    
+    _write_results(sink, result_data)
+    log_success("%d resultados añadidos a: %s", len(ranked), sink.path)
+    return result_data
+
+def _write_results(sink, result_data):
+    """Envía al sink un registro por cada resultado de `result_data`"""
+    for item in result_data["results"]:
+        sink.write({"timestamp": result_data["timestamp"], "search_query": result_data["search_query"],
+                    "engine": result_data["engine"], **item})
+
+def _trim_pages(result_data, max_pages):
+    """Copia de `result_data` con solo los resultados de las primeras `max_pages` páginas"""
+    return {**result_data, "results": [item for item in result_data["results"] if item["page"] <= max_pages]}
+
+def _search_http(search_query, search_engine, max_pages, sink):
+    """Intento rápido sin navegador. Devuelve el resultado, o None si hay que usar el navegador"""
+    try:
+        results, kind = fetch_results_http(search_query, search_engine)
+        if not results:
+            log_warning("Sin resultados por HTTP (%s), usando el navegador...", kind)
+            return None
+        return _collect_results(
+            search_query, search_engine, results,
+            lambda page: fetch_results_http(search_query, search_engine, page)[0],
+            max_pages, sink, via="http",
+        )
+    except Exception as e:
+        log_warning("La descarga sin navegador falló (%s: %s), usando el navegador...", type(e).__name__, e)
+        return None
+
+def _search_attempt(driver, search_query, search_engine, navigation_mode, max_pages, sink):
+    """
+    Un intento de búsqueda con un navegador ya iniciado
+    
+    Returns:
+        (result_data, None) si hubo resultados, o (None, tipo de fallo) con los
+        tipos de retry_policy: timeout, blocked, selector_miss, driver_crash, unknown
+    """
+    try:
+        # No descargar imágenes, fuentes, vídeos ni trackers (no se usan al extraer)
+        try:
+            patterns = apply_blocking(driver, search_engine)
+            log_debug("Bloqueo de recursos: %d patrones de URL activos", len(patterns))
+        except Exception as e:
+            log_warning("No se pudo activar el bloqueo de recursos: %s", e)
+        if stats_enabled():
+            collect_stats(driver)  # Descartar el tráfico de búsquedas anteriores
         
-        for selector, descripcion in selectores:
-            try:
-                results = results_container.find_elements(By.CSS_SELECTOR, selector)
-                # Filtrar resultados que tengan contenido real (no son tabs)
-                results = [r for r in results if r.text and len(r.text.strip()) > 10]
-                if results:
-                    log_success(f"Encontrados {len(results)} elementos con {descripcion}")
-                    break
-            except:
-                pass
-            
-            log_info(f"  → {descripcion}: {len(results) if results else 0} elementos encontrados")
+        # Ir directamente a la página de resultados y, si falla, usar el formulario
+        loaded = False
+        if navigation_mode == "direct":
+            loaded = navigate_direct(driver, search_query, search_engine)
+            if not loaded:
+                log_warning("La navegación directa falló o fue bloqueada, usando el formulario de búsqueda...")
+        if not loaded:
+            navigate_form(driver, search_query, search_engine)
         
-        log_info(f"  → Total de resultados válidos: {len(results)} elementos")
+        results = extract_page(driver, search_engine)
         
         if not results:
             log_error("No se encontraron resultados con ningún selector conocido")
-            log_warning("Guardando screenshot y HTML para debugging...")
-            try:
-                driver.save_screenshot("debug_no_results.png")
-                log_info("Screenshot guardado: debug_no_results.png")
-            except:
-                pass
-            try:
-                with open("debug_page_source.html", "w", encoding="utf-8") as f:
-                    f.write(driver.page_source)
-                log_info("HTML de la página guardado: debug_page_source.html")
-            except:
-                pass
-            print("\n" + "="*70)
-            if search_engine == "google":
-                print("⚠️  CAUSA PROBABLE: Google está bloqueando el acceso automatizado")
+            blocked = is_blocked(driver)
+            capture_failure(driver, BLOCKED if blocked else SELECTOR_MISS, search_engine, search_query)
+            if blocked:
+                log_warning("Causa probable: %s está bloqueando el acceso automatizado", search_engine.capitalize())
             else:
-                print("⚠️  CAUSA PROBABLE: No se encontraron resultados en Bing")
-            print("="*70)
-            print("Soluciones posibles:")
-            print("  1. Espera 15-30 minutos e intenta de nuevo")
-            print("  2. El buscador ha detectado múltiples accesos automatizados")
-            print("  3. Verifica tu conexión a internet")
-            print("="*70 + "\n")
-            return None
-        
-        log_success(f"Encontrados {len(results)} resultados de búsqueda")
-        log_info("Extrayendo información del PRIMER resultado...")
-        first_result = results[0]
+                log_warning("Causa probable: no se encontraron resultados en %s", search_engine.capitalize())
+            return None, (BLOCKED if blocked else SELECTOR_MISS)
         
-        # Extraer información del primer resultado
+        # Numerar todos los resultados, página a página, y enviarlos al sink al final
         try:
-            # Obtener título - múltiples intentos
-            log_info("  • Buscando título...")
-            title = "Título no encontrado"
-            
-            # El título puede estar en h3, h2, o directamente en el div
-            if search_engine == "google":
-                selectores_titulo = [
-                    (By.CSS_SELECTOR, "h3"),  
-                    (By.CSS_SELECTOR, "h2"),
-                    (By.XPATH, ".//div[@role='heading']"),
-                    (By.XPATH, ".//span[@role='heading']"),
-                ]
-            elif search_engine == "bing":
-                selectores_titulo = [
-                    (By.CSS_SELECTOR, "h2"),  # En Bing es h2
-                    (By.CSS_SELECTOR, "h3"),
-                    (By.XPATH, ".//a"),  # El link en Bing contiene el título
-                ]
-            
-            for selector_type, selector_value in selectores_titulo:
-                try:
-                    title_elem = first_result.find_element(selector_type, selector_value)
-                    if title_elem and title_elem.text:
-                        title = title_elem.text
-                        log_success(f"    ✓ Título encontrado: '{title}'")
-                        break
-                except:
-                    pass
-            
-            # Obtener URL - si es un link, extraer href
-            log_info("  • Buscando URL...")
-            url = "URL no encontrada"
+            result_data = _collect_results(
+                search_query, search_engine, results,
+                lambda page: load_results_page(driver, search_query, search_engine, page),
+                max_pages, sink, via="browser",
+            )
+            if stats_enabled():
+                log_info("Tráfico de red de la búsqueda: %s", format_stats(collect_stats(driver)))
+            return result_data, None
             
-            # Si first_result es un link directo
-            if first_result.tag_name == "a":
-                href = first_result.get_attribute("href")
-                if href and not href.startswith("javascript"):
-                    url = href
-                    log_success(f"    ✓ URL encontrada (elemento es link): '{url}'")
+        except Exception as e:
+            log_exception("Error al extraer datos del resultado (%s): %s", type(e).__name__, e)
             
-            # Si no, buscar link dentro
-            if url == "URL no encontrada":
-                try:
-                    link_elem = first_result.find_element(By.CSS_SELECTOR, "a")
-                    href = link_elem.get_attribute("href")
-                    if href and not href.startswith("javascript"):
-                        url = href
-                        log_success(f"    ✓ URL encontrada (dentro): '{url}'")
-                except:
-                    pass
+            capture_failure(driver, "extraction_error", search_engine, search_query)
+            return None, classify_exception(e)
+    
+    except Exception as e:
+        log_exception("Error general durante la búsqueda (%s): %s", type(e).__name__, e)
+        
+        kind = classify_exception(e)
+        if kind == DRIVER_CRASH:
+            return None, kind  # El navegador no responde: no se puede guardar nada
+        
+        capture_failure(driver, f"general_error:{kind}", search_engine, search_query)
+        
+        # Un formulario que no aparece suele ser una página de bloqueo/CAPTCHA
+        if is_blocked(driver):
+            return None, BLOCKED
+        
+        log_warning("Posibles causas: bloqueo del buscador, conexión a internet, "
+                    "Chrome/Chromium sin iniciar o cambios en el HTML de la página")
+        return None, kind
+
+def search_google_news(search_query, retry_count=0, headless=None, search_engine=None, driver=None,
+                       navigation_mode=None, max_pages=None, sink=None, use_cache=True, failover=True):
+    """
+    Busca en Google o Bing y extrae el contenido del primer resultado sin entrar
+    
+    Si un intento falla se reintenta (hasta RETRY_MAX_ATTEMPTS intentos) con
+    espera exponencial y jitter, reutilizando el navegador salvo que se haya
+    caído. Si el buscador nos bloquea o su circuit breaker está abierto, la
+    búsqueda pasa al otro buscador (ver retry_policy.py).
+    
+    Args:
+        search_query: Término de búsqueda
+        retry_count: Intentos ya realizados (los reintentos empiezan a contar desde aquí)
+        headless: Si True, ejecuta sin ventana visible (más rápido). Si None, lee del .env
+        search_engine: 'google' o 'bing'. Si None, lee del .env
+        driver: Navegador ya iniciado (p. ej. prestado por un DriverPool). Si se
+            proporciona, se reutiliza y NO se cierra al terminar
+        navigation_mode: 'direct' (ir a /search?q=...) o 'form' (portada + formulario).
+            Si None, lee NAVIGATION_MODE del .env
+        max_pages: Páginas de resultados a recorrer. Si None, lee MAX_PAGES del .env
+        sink: ResultWriter (o JsonlSink) donde se añade cada resultado. Si None,
+            se abre el configurado en .env (OUTPUT_FORMAT) solo para esta búsqueda
+        use_cache: Si True (y CACHE_ENABLED=true en .env), devuelve el resultado
+            guardado si la misma búsqueda se hizo hace menos de CACHE_TTL segundos
+        failover: Si False, nunca cambia de buscador (p. ej. en search_all_engines)
+    """
+    
+    # Usar configuración del .env si no se proporciona explícitamente
+    if search_engine is None:
+        search_engine = os.getenv("SEARCH_ENGINE", "bing").lower()
+    if headless is None:
+        headless = os.getenv("HEADLESS", "true").lower() == "true"
+    if navigation_mode is None:
+        navigation_mode = os.getenv("NAVIGATION_MODE", "direct").lower()
+    if max_pages is None:
+        max_pages = int(os.getenv("MAX_PAGES", "1"))
+    
+    log_info("Iniciando búsqueda: '%s'", search_query)
+    log_info("Motor de búsqueda: %s", search_engine.upper())
+    
+    if search_engine not in ENGINE_URLS:
+        log_error("Motor de búsqueda desconocido: %s", search_engine)
+        return None
+    
+    query_metrics = metrics.start(search_query, search_engine)
+    status = "error"
+    
+    cache = get_cache() if use_cache else None
+    if cache:
+        with metrics.span("cache_lookup"):
+            cached = cache.get(search_engine, search_query)
+        if cached and cached["max_pages"] >= max_pages:
+            # Una búsqueda cacheada con más páginas sirve, recortada, para menos
+            result_data = _trim_pages(cached["result"], max_pages)
+            cache_sink = sink if sink is not None else ResultWriter.from_env()
+            try:
+                _write_results(cache_sink, result_data)
+            finally:
+                if sink is None:
+                    cache_sink.close()
+            log_success("Resultado servido desde la caché (%d resultados)", len(result_data["results"]))
+            metrics.finish("cache_hit")
+            return result_data
+    
+    owns_driver = driver is None
+    
+    # Verificar que Docker está corriendo (o que estamos en un contenedor)
+    if owns_driver and not check_docker_running():
+        log_error("No se pudo verificar el entorno Docker")
+        metrics.finish(status)
+        return None
+    
+    owns_sink = sink is None
+    if owns_sink:
+        sink = ResultWriter.from_env()
+    
+    backoff = Backoff.from_env()
+    engine = search_engine
+    attempt = retry_count
+    # Buscadores que se intentan primero con HTTP simple (una vez cada uno)
+    http_engines = [e.strip() for e in os.getenv("HTTP_FAST_PATH", "bing").lower().split(",") if e.strip()]
+    http_tried = set()
+    
+    try:
+        while attempt < backoff.max_attempts:
+            chosen = _pick_engine(engine, failover)
+            if chosen is None:
+                log_error("Circuit breaker abierto para %s%s; se reintentará en %.0fs", engine.upper(),
+                          " y el resto de buscadores" if failover else "", get_breaker(engine).remaining())
+                status = "circuit_open"
+                return None
+            if chosen != engine:
+                log_warning("%s tiene el circuit breaker abierto, usando %s", engine.upper(), chosen.upper())
+            engine = query_metrics.engine = chosen
             
-            # Obtener descripción/snippet
-            log_info("  • Buscando descripción/snippet...")
-            snippet = "No hay descripción disponible"
+            # Primero sin navegador; si no hay resultados, con Selenium
+            if engine in http_engines and engine not in http_tried:
+                http_tried.add(engine)
+                result_data = _search_http(search_query, engine, max_pages, sink)
+                if result_data:
+                    get_breaker(engine).record_success()
+                    if cache:
+                        cache.put(engine, search_query, {"max_pages": max_pages, "result": result_data})
+                    log_success("✅ PROCESO COMPLETADO CON ÉXITO (sin navegador)")
+                    status = "ok"
+                    return result_data
             
-            if search_engine == "google":
-                selectores_snippet = [
-                    (By.CSS_SELECTOR, "span.VwiC3b"),  # Selector moderno
-                    (By.CSS_SELECTOR, "div.s"),  # Selector antiguo
-                    (By.CSS_SELECTOR, "span.s"),
-                    (By.XPATH, ".//div[@role='cell']//span"),
-                    (By.XPATH, ".//div[contains(@class, 'snippet') or contains(@class, 'description')]"),
-                    (By.XPATH, ".//span[contains(@class, 'preview')]"),
-                ]
-            elif search_engine == "bing":
-                selectores_snippet = [
-                    (By.CSS_SELECTOR, "p"),  # En Bing es generalmente un párrafo
-                    (By.CSS_SELECTOR, "div.b_caption"),
-                    (By.XPATH, ".//div[contains(@class, 'snippet')]"),
-                ]
+            attempt += 1
+            log_info("Intento %d de %d (%s)", attempt, backoff.max_attempts, engine.upper())
             
-            for selector_type, selector_value in selectores_snippet:
+            result_data, kind = None, None
+            if driver is None:
                 try:
-                    snippet_elem = first_result.find_element(selector_type, selector_value)
-                    if snippet_elem and snippet_elem.text:
-                        snippet = snippet_elem.text
-                        log_success(f"    ✓ Descripción encontrada")
-                        break
-                except:
-                    pass
-            
-            # Si aún no tenemos datos válidos, intenta extraer todo el texto
-            if title == "Título no encontrado":
-                log_warning("    → No se encontró estructura estándar, extrayendo texto disponible...")
-                all_text = first_result.text
-                lines = [l.strip() for l in all_text.split('\n') if l.strip()]
-                if lines:
-                    title = lines[0] if lines else "Título no disponible"
-                    if len(lines) > 1:
-                        snippet = '\n'.join(lines[1:3])
-                    log_info(f"    ✓ Extrayendo del texto disponible")
+                    with metrics.span("driver_startup"):
+                        driver = create_driver(headless)
+                except Exception as e:
+                    log_error("No se pudo iniciar el navegador: %s", e)
+                    kind = DRIVER_CRASH
+            if driver is not None:
+                result_data, kind = _search_attempt(driver, search_query, engine, navigation_mode,
+                                                    max_pages, sink)
             
-            # Crear resultado
-            result_data = {
-                "timestamp": datetime.now().isoformat(),
-                "search_query": search_query,
-                "result": {
-                    "title": title,
-                    "url": url,
-                    "snippet": snippet
-                }
-            }
+            breaker = get_breaker(engine)
+            if result_data:
+                breaker.record_success()
+                if cache:
+                    cache.put(engine, search_query, {"max_pages": max_pages, "result": result_data})
+                log_success("✅ PROCESO COMPLETADO CON ÉXITO")
+                status = "ok"
+                return result_data
             
-            print(f"\n{'='*70}")
-            print(f"✅ BÚSQUEDA COMPLETADA EXITOSAMENTE")
-            print(f"{'='*70}")
-            print(f"📰 TÍTULO: {title}")
-            print(f"🔗 URL: {url}")
-            print(f"📝 DESCRIPCIÓN:\n{snippet}")
-            print(f"{'='*70}\n")
+            breaker.record_failure(kind)
+            status = kind
+            log_warning("Intento %d fallido: %s", attempt, kind)
             
-            log_info("Guardando resultado en archivo JSON...")
-            output_file = "output/resultado_busqueda.json"
-            os.makedirs("output", exist_ok=True)
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(result_data, f, ensure_ascii=False, indent=2)
-            log_success(f"Archivo guardado en: {output_file}")
+            # Un bloqueo marca el perfil del navegador (sus cookies nos delatan) y
+            # se sigue con otro navegador y otro perfil
+            flagged = kind == BLOCKED and driver is not None and flag_driver(driver, f"bloqueo en {engine}")
+            # Solo se reutiliza el navegador si sigue respondiendo, falle como falle
+            dead = driver is not None and (kind == DRIVER_CRASH or (not flagged and not driver_responds(driver)))
+            if dead or flagged:
+                # Un navegador prestado lo descarta el pool al devolverlo (no pasa el
+                # chequeo de salud); para reintentar abrimos uno propio
+                log_warning("El navegador no responde, se abrirá uno nuevo" if dead
+                            else "Perfil marcado por bloqueo, se abrirá un navegador nuevo")
+                if owns_driver:
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+                driver, owns_driver = None, True
             
-            log_success("✅ PROCESO COMPLETADO CON ÉXITO")
-            return result_data
+            if attempt >= backoff.max_attempts:
+                break
             
-        except Exception as e:
-            log_error(f"Error al extraer datos del resultado: {e}")
-            log_error(f"Tipo de error: {type(e).__name__}")
-            import traceback
-            log_error(f"Traceback completo:\n{traceback.format_exc()}")
+            # Si nos bloquean, probar el otro buscador sin esperar
+            if failover and (kind == BLOCKED or breaker.state == breaker.OPEN):
+                engine = _other_engine(engine)
+                log_warning("Cambiando a %s para el siguiente intento", engine.upper())
+                continue
             
-            log_warning("Guardando screenshot y HTML para debugging...")
-            try:
-                driver.save_screenshot("debug_extraction_error.png")
-                log_info("Screenshot guardado: debug_extraction_error.png")
-            except:
-                pass
+            delay = backoff.delay(attempt - retry_count)
+            log_info("Reintentando en %.1f segundos...", delay)
+            with metrics.span("retry_backoff"):
+                time.sleep(delay)
+        
+        log_error("Búsqueda fallida tras %d intentos", attempt)
+        return None
+    
+    finally:
+        if owns_sink:
+            sink.close()
+        if driver and owns_driver:
+            log_info("Cerrando navegador...")
+            with metrics.span("driver_quit"):
+                try:
+                    driver.quit()
+                    log_success("Navegador cerrado correctamente")
+                except Exception as e:
+                    log_warning("No se pudo cerrar el navegador: %s", e)
+        record = metrics.finish(status)
+        if record and logger.isEnabledFor(logging.INFO):
+            slowest = sorted(record["phases"].items(), key=lambda item: -item[1])[:3]
+            log_info("Métricas: %.2fs en total; fases más lentas: %s", record["total_ms"] / 1000,
+                     ", ".join(f"{name}={ms:.0f}ms" for name, ms in slowest))
+
+def search_all_engines(search_query, engines=("google", "bing"), budget=None, headless=None):
+    """
+    Lanza la misma búsqueda en varios buscadores a la vez y mezcla los resultados
+    
+    Cada buscador usa su propio navegador en un hilo y todos escriben en el mismo
+    ResultWriter. Los resultados se intercalan por posición y se eliminan las URLs
+    repetidas (ver merge_results.normalize_url).
+    
+    Args:
+        search_query: Término de búsqueda
+        engines: Buscadores a consultar
+        budget: Segundos máximos de espera. Si se indica, se devuelve en cuanto el
+            primer buscador responde con resultados (o al agotarse el tiempo), sin
+            esperar al resto. Si None, lee FANOUT_BUDGET del .env (vacío = esperar a todos)
+        headless: Igual que en search_google_news
+    
+    Returns:
+        Diccionario con el formato de search_google_news más `engines`
+        ({buscador: 'ok' | 'failed' | 'pending'}), o None si ninguno respondió
+    """
+    if budget is None and os.getenv("FANOUT_BUDGET"):
+        budget = float(os.getenv("FANOUT_BUDGET"))
+    
+    log_info("Búsqueda en paralelo en: %s%s", ", ".join(e.upper() for e in engines),
+             f" (presupuesto {budget:.0f}s)" if budget else "")
+    
+    # Un solo escritor: varios sobre el mismo archivo mezclarían sus líneas y rotaciones
+    sink = ResultWriter.from_env()
+    executor = ThreadPoolExecutor(max_workers=len(engines))
+    futures = {
+        executor.submit(search_google_news, search_query, headless=headless, search_engine=engine,
+                        failover=False, sink=sink): engine
+        for engine in engines
+    }
+    status = {engine: "pending" for engine in engines}
+    answers = {}
+    try:
+        for future in as_completed(futures, timeout=budget):
+            engine = futures[future]
             try:
-                with open("debug_page_source.html", "w", encoding="utf-8") as f:
-                    f.write(driver.page_source)
-                log_info("HTML de la página guardado: debug_page_source.html")
-            except:
-                pass
-            
-            if retry_count < 1:
-                log_info("Reintentando en 3 segundos...")
-                time.sleep(3)
-                return search_google_news(search_query, retry_count + 1, headless, search_engine)
+                result = future.result()
+            except Exception as e:
+                log_error("%s falló: %s", engine.upper(), e)
+                result = None
+            status[engine] = "ok" if result else "failed"
+            if result:
+                answers[engine] = result["results"]
+                log_success("%s respondió con %d resultados", engine.upper(), len(result["results"]))
+                if budget:
+                    break
+    except FuturesTimeout:
+        log_warning("Presupuesto de %.0fs agotado; buscadores pendientes: %s", budget,
+                    ", ".join(e for e, st in status.items() if st == "pending"))
+    finally:
+        # Los buscadores pendientes terminan en segundo plano y cierran su navegador;
+        # el escritor se cierra cuando acaba el último
+        executor.shutdown(wait=False)
+        if all(future.done() for future in futures):
+            sink.close()
+        else:
+            threading.Thread(target=lambda: (wait(futures), sink.close()), name="fanout-writer").start()
+    
+    if not answers:
+        log_error("Ningún buscador devolvió resultados")
+        return None
+    
+    # Mezclar en el orden de `engines` (el primero tiene preferencia en los empates)
+    merged = merge_ranked({engine: answers[engine] for engine in engines if engine in answers})
+    first = merged[0]
+    result_data = {
+        "timestamp": datetime.now().isoformat(),
+        "search_query": search_query,
+        "engines": status,
+        "result": {"title": first["title"], "url": first["url"], "snippet": first["snippet"]},
+        "results": merged,
+    }
+    duplicates = sum(len(items) for items in answers.values()) - len(merged)
+    log_success("Resultados mezclados: %d únicos (%d duplicados eliminados)", len(merged), duplicates)
+    return result_data
+
+def load_queries(path):
+    """Lee un archivo de búsquedas: una por línea, ignorando vacías y comentarios (#)"""
+    with open(path, encoding="utf-8") as f:
+        return [l.strip() for l in f if l.strip() and not l.strip().startswith("#")]
+
+def run_batch(queries, pool_size=None, max_uses=None, headless=None, search_engine=None):
+    """
+    Ejecuta muchas búsquedas reutilizando un pool fijo de navegadores
+    
+    Args:
+        queries: Lista de búsquedas o ruta a un archivo con una búsqueda por línea
+        pool_size: Navegadores simultáneos. Si None, lee POOL_SIZE del .env
+            (por defecto, el número de núcleos)
+        max_uses: Búsquedas por navegador antes de reciclarlo. Si None, lee DRIVER_MAX_USES
+        headless: Igual que en search_google_news
+        search_engine: Igual que en search_google_news
+    
+    Returns:
+        Lista de resultados (None para las búsquedas fallidas), en el mismo orden
+    """
+    if isinstance(queries, str):
+        queries = load_queries(queries)
+    if not queries:
+        log_warning("No hay búsquedas que ejecutar")
+        return []
+    
+    if pool_size is None:
+        pool_size = int(os.getenv("POOL_SIZE", "0")) or os.cpu_count() or 1
+    if max_uses is None:
+        max_uses = int(os.getenv("DRIVER_MAX_USES", "50"))
+    if headless is None:
+        headless = os.getenv("HEADLESS", "true").lower() == "true"
+    pool_size = max(1, min(pool_size, len(queries)))
+    
+    if not check_docker_running():
+        log_error("No se pudo verificar el entorno Docker")
+        return [None] * len(queries)
+    
+    log_info("Modo batch: %d búsquedas con %d navegadores (reciclado cada %s usos)",
+             len(queries), pool_size, max_uses or "∞")
+    
+    def _worker(query):
+        try:
+            with pool.driver() as driver:
+                return search_google_news(query, headless=headless, search_engine=search_engine,
+                                          driver=driver, sink=sink)
+        except Exception as e:
+            log_error("Fallo en la búsqueda '%s': %s", query, e)
             return None
     
-    except Exception as e:
-        log_error(f"Error general durante la búsqueda: {e}")
-        log_error(f"Tipo de error: {type(e).__name__}")
-        import traceback
-        log_error(f"Traceback completo:\n{traceback.format_exc()}")
+    start = time.monotonic()
+    with ResultWriter.from_env() as sink, \
+            DriverPool(lambda: create_driver(headless), pool_size, max_uses, **pool_memory_options()) as pool:
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            resultados = list(executor.map(_worker, queries))
+        created, over_memory = pool.created, pool.over_memory
+    elapsed = time.monotonic() - start
+    
+    ok = sum(1 for r in resultados if r)
+    rate = len(queries) / elapsed * 60 if elapsed > 0 else 0.0
+    log_success("Batch terminado: %d/%d correctas en %.1fs (%.1f búsquedas/minuto, %d navegadores iniciados)",
+                ok, len(queries), elapsed, rate, created)
+    if over_memory:
+        log_info("%d navegadores reciclados por superar DRIVER_MAX_MEMORY_MB", over_memory)
+    log_success("%d resultados añadidos a: %s", sink.count, sink.path)
+    log_cache_stats()
+    return resultados
+
+def serve(headless=None, search_engine=None):
+    """
+    Modo servicio: mantiene navegadores abiertos y atiende búsquedas por HTTP o socket Unix
+    
+    Lee SERVER_HOST/SERVER_PORT (o SERVER_SOCKET), SERVER_QUEUE_SIZE, SERVER_TIMEOUT,
+    SERVER_MAX_PAGES, POOL_SIZE y DRIVER_MAX_USES del .env. Ver scraper_server.py para la API.
+    """
+    if headless is None:
+        headless = os.getenv("HEADLESS", "true").lower() == "true"
+    pool_size = int(os.getenv("POOL_SIZE", "0")) or os.cpu_count() or 1
+    max_uses = int(os.getenv("DRIVER_MAX_USES", "50"))
+    
+    if not check_docker_running():
+        log_error("No se pudo verificar el entorno Docker")
+        return
+    
+    with ResultWriter.from_env() as sink, \
+            DriverPool(lambda: create_driver(headless), pool_size, max_uses, **pool_memory_options()) as pool:
+        log_info("Arrancando %d navegadores...", pool_size)
+        pool.warm()
+        log_success("%d navegadores listos", pool_size)
+        
+        def _handle(request):
+            with pool.driver() as driver:
+                return search_google_news(
+                    request["query"].strip(),
+                    headless=headless,
+                    search_engine=(request.get("engine") or search_engine or "").lower() or None,
+                    driver=driver,
+                    max_pages=request.get("max_pages"),
+                    sink=sink,
+                    use_cache=request.get("use_cache", True),
+                )
+        
+        server = SearchServer(
+            _handle,
+            concurrency=pool_size,
+            queue_size=int(os.getenv("SERVER_QUEUE_SIZE", "32")),
+            request_timeout=float(os.getenv("SERVER_TIMEOUT", "120")),
+            engines=tuple(ENGINE_URLS),
+            max_pages_limit=int(os.getenv("SERVER_MAX_PAGES", "10")),
+        )
+        server.serve_forever(
+            host=os.getenv("SERVER_HOST", "127.0.0.1"),
+            port=int(os.getenv("SERVER_PORT", "8765")),
+            unix_socket=os.getenv("SERVER_SOCKET") or None,
+        )
+        log_info("Cerrando navegadores...")
+    log_cache_stats()
+
+def enqueue_queries(queries, search_engine=None, max_pages=None):
+    """
+    Modo productor: añade búsquedas a la cola de trabajos (ver work_queue.py)
+    
+    Args:
+        queries: Lista de búsquedas o ruta a un archivo con una búsqueda por línea
+        search_engine: Buscador de los trabajos. Si None, el del .env de cada worker
+        max_pages: Páginas por búsqueda. Si None, el MAX_PAGES de cada worker
+    
+    Returns:
+        Número de trabajos nuevos o reabiertos (los pendientes y los terminados
+        hace menos de QUEUE_REOPEN_AFTER no se duplican)
+    """
+    if isinstance(queries, str):
+        queries = load_queries(queries)
+    with open_queue() as queue:
+        purge_queue(queue)
+        added = sum(1 for query in queries if queue.enqueue(query, search_engine, max_pages)[1])
+        log_success("%d búsquedas encoladas (%d ya estaban en la cola)", added, len(queries) - added)
+        log_info("Estado de la cola: %s", queue.stats())
+    return added
+
+def purge_queue(queue=None, days=None):
+    """
+    Borra de la cola los trabajos terminados o fallidos de hace más de `days` días
+    
+    Args:
+        queue: Cola abierta. Si None, se abre la del .env
+        days: Antigüedad mínima. Si None, QUEUE_RETENTION_DAYS del .env (0 = no borrar)
+    
+    Returns:
+        Número de trabajos borrados
+    """
+    if days is None:
+        days = float(os.getenv("QUEUE_RETENTION_DAYS", "7"))
+    if days <= 0:
+        return 0
+    if queue is None:
+        with open_queue() as queue:
+            return purge_queue(queue, days)
+    purged = queue.purge(days * 86400)
+    if purged:
+        log_info("Cola: %d trabajos terminados o fallidos de hace más de %g días borrados", purged, days)
+    return purged
+
+def run_worker(headless=None, search_engine=None, exit_when_empty=None):
+    """
+    Modo worker: toma búsquedas de la cola, las ejecuta y guarda los resultados
+    
+    Se pueden lanzar tantos workers como se quiera (p. ej. con
+    `docker compose up --scale scraper-worker=4`). Cada uno usa WORKER_CONCURRENCY
+    navegadores. Mientras busca renueva la reserva del trabajo; si el worker muere,
+    la reserva caduca (QUEUE_VISIBILITY) y otro worker lo retoma. Los resultados
+    se añaden al JSONL solo la primera vez que se completa cada trabajo; cada
+    worker escribe en su propio archivo (resultados.<host>-<pid>.jsonl).
+    Con SIGTERM/SIGINT termina las búsquedas en curso y sale.
+    
+    Args:
+        exit_when_empty: Si True, sale cuando no quedan trabajos. Si None, lee
+            QUEUE_EXIT_WHEN_EMPTY del .env
+    """
+    if headless is None:
+        headless = os.getenv("HEADLESS", "true").lower() == "true"
+    if exit_when_empty is None:
+        exit_when_empty = os.getenv("QUEUE_EXIT_WHEN_EMPTY", "false").lower() == "true"
+    concurrency = int(os.getenv("WORKER_CONCURRENCY", "1"))
+    max_uses = int(os.getenv("DRIVER_MAX_USES", "50"))
+    poll_interval = float(os.getenv("QUEUE_POLL_INTERVAL", "5"))
+    
+    if not check_docker_running():
+        log_error("No se pudo verificar el entorno Docker")
+        return
+    
+    stopping = threading.Event()
+    
+    def _on_signal(signum, frame):
+        log_warning("Señal de parada recibida: terminando las búsquedas en curso...")
+        stopping.set()
+    
+    signal.signal(signal.SIGTERM, _on_signal)
+    signal.signal(signal.SIGINT, _on_signal)
+    
+    worker_name = f"{socket.gethostname()}-{os.getpid()}"
+    counts = {"done": 0, "failed": 0}  # "failed" cuenta intentos: el trabajo puede reintentarse
+    counts_lock = threading.Lock()
+    
+    def _process(job):
+        # Renovar la reserva mientras dure la búsqueda
+        finished = threading.Event()
         
-        log_warning("Guardando screenshot y HTML para debugging...")
+        def _heartbeat():
+            while not finished.wait(queue.visibility / 3):
+                if not queue.extend(job):
+                    log_warning("Trabajo %s: la reserva caducó y otro worker lo ha tomado", job.id)
+                    return
+        
+        heartbeat = threading.Thread(target=_heartbeat, daemon=True)
+        heartbeat.start()
+        buffer = MemorySink()
         try:
-            if driver:
-                driver.save_screenshot("debug_general_error.png")
-                log_info("Screenshot guardado: debug_general_error.png")
-                with open("debug_page_source.html", "w", encoding="utf-8") as f:
-                    f.write(driver.page_source)
-                log_info("HTML de la página guardado: debug_page_source.html")
-        except:
-            pass
+            with pool.driver() as driver:
+                result = search_google_news(job.query, headless=headless,
+                                            search_engine=job.engine or search_engine,
+                                            driver=driver, max_pages=job.max_pages, sink=buffer)
+        except Exception as e:
+            log_error("Fallo en el trabajo %s: %s", job.id, e)
+            result = None
+        finally:
+            finished.set()
+            heartbeat.join()
         
-        print("\n" + "="*70)
-        print("POSIBLES CAUSAS:")
-        print("="*70)
-        print("  1. Google está bloqueando el acceso automatizado (MÁS PROBABLE)")
-        print("  2. Problema de conexión a internet")
-        print("  3. Chrome/Chromium no se pudo inicializar")
-        print("  4. Cambios en la estructura HTML de Google")
-        print("="*70 + "\n")
-        return None
+        if result is None:
+            queue.fail(job, "sin resultados")
+            log_warning("Trabajo %s fallido (intento %d de %d)", job.id, job.attempts, queue.max_attempts)
+            outcome = "failed"
+        elif queue.complete(job, result):
+            for record in buffer.records:
+                sink.write(record)
+            log_success("Trabajo %s completado: %d resultados", job.id, len(result["results"]))
+            outcome = "done"
+        else:
+            log_warning("Trabajo %s ya completado por otro worker, resultado descartado", job.id)
+            outcome = "done"
+        with counts_lock:
+            counts[outcome] += 1
     
-    finally:
-        if driver:
-            log_info("Cerrando navegador...")
-            driver.quit()
-            log_success("Navegador cerrado correctamente")
+    def _loop(slot):
+        name = f"{worker_name}-{slot}"
+        while not stopping.is_set():
+            job = queue.lease(name)
+            if job is None:
+                if exit_when_empty:
+                    return
+                stopping.wait(poll_interval)
+                continue
+            log_info("[%s] Trabajo %s: '%s' (intento %d)", name, job.id, job.query, job.attempts)
+            _process(job)
+    
+    log_info("Worker %s: %d navegadores, cola '%s'", worker_name, concurrency, os.getenv("QUEUE_BACKEND", "sqlite"))
+    with open_queue() as queue, ResultWriter.from_env(suffix=worker_name) as sink, \
+            DriverPool(lambda: create_driver(headless), concurrency, max_uses,
+                       **pool_memory_options()) as pool:
+        threads = [threading.Thread(target=_loop, args=(slot,)) for slot in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        log_success("Worker terminado: %d trabajos completados, %d intentos fallidos", counts["done"], counts["failed"])
+        log_info("Estado de la cola: %s", queue.stats())
+    log_cache_stats()
+
+def log_cache_stats():
+    """Muestra los contadores de la caché de resultados (si está activa)"""
+    cache = get_cache()
+    if cache:
+        stats = cache.stats()
+        log_info("Caché: %d aciertos, %d fallos (%.0f%%), %d caducadas, %d expulsadas, %d entradas",
+                 stats["hits"], stats["misses"], stats["hit_rate"] * 100, stats["expired"],
+                 stats["evictions"], stats["entries"])
+
+def _arg_value(flag, default=None):
+    """Devuelve el valor que sigue a `flag` en sys.argv, o `default`"""
+    if flag in sys.argv:
+        idx = sys.argv.index(flag)
+        if idx + 1 < len(sys.argv):
+            return sys.argv[idx + 1]
+    return default
 
 if __name__ == "__main__":
     # Obtener parámetros de línea de comandos
@@ -516,6 +1300,46 @@ if __name__ == "__main__":
         search_engine = "google"
         log_info("Google será utilizado como motor de búsqueda")
     
+    # Modo servicio: --serve (navegadores calientes + API HTTP/socket Unix)
+    if "--serve" in sys.argv:
+        serve(headless=headless, search_engine=search_engine)
+        sys.exit(0)
+    
+    # Cola de trabajos: --enqueue archivo.txt (productor), --worker [--exit-when-empty]
+    # o --purge-queue [días] (borrar trabajos terminados antiguos)
+    if "--purge-queue" in sys.argv:
+        days = _arg_value("--purge-queue")
+        purge_queue(days=float(days) if days and not days.startswith("--") else None)
+        sys.exit(0)
+    enqueue_file = _arg_value("--enqueue")
+    if enqueue_file:
+        enqueue_queries(enqueue_file, search_engine=search_engine)
+        sys.exit(0)
+    if "--worker" in sys.argv:
+        run_worker(headless=headless, search_engine=search_engine,
+                   exit_when_empty=True if "--exit-when-empty" in sys.argv else None)
+        sys.exit(0)
+    
+    # Google y Bing a la vez: --all-engines [--budget segundos]
+    if "--all-engines" in sys.argv:
+        budget = _arg_value("--budget")
+        today = datetime.now().strftime("%d/%m/%Y")
+        resultado = search_all_engines(f"Noticias {today}", budget=float(budget) if budget else None,
+                                       headless=headless)
+        if resultado:
+            save_result_json(resultado)
+            if verbose_output():
+                print(json.dumps(resultado, indent=2, ensure_ascii=False))
+        sys.exit(0 if resultado else 1)
+    
+    # Modo batch: --batch archivo.txt [--pool-size N]
+    batch_file = _arg_value("--batch")
+    if batch_file:
+        pool_size = _arg_value("--pool-size")
+        resultados = run_batch(batch_file, pool_size=int(pool_size) if pool_size else None,
+                               headless=headless, search_engine=search_engine)
+        sys.exit(0 if resultados and any(resultados) else 1)
+    
     # Obtener fecha de hoy en formato dd/mm/yyyy
     today = datetime.now().strftime("%d/%m/%Y")
     search_query = f"Noticias {today}"
@@ -536,14 +1360,18 @@ if __name__ == "__main__":
     print(f"{'Hora de inicio:':.<50} {datetime.now().strftime('%H:%M:%S')}")
     print(f"{'='*70}\n")
     
-    resultado = search_google_news(search_query, headless=headless, search_engine=search_engine)
+    resultado = search_google_news(search_query, headless=headless, search_engine=search_engine,
+                                   use_cache="--no-cache" not in sys.argv)
+    log_cache_stats()
     
     if resultado:
-        print("\n" + "="*70)
-        print("📊 RESULTADO GUARDADO EN JSON")
-        print("="*70)
-        print(json.dumps(resultado, indent=2, ensure_ascii=False))
-        print("="*70 + "\n")
+        save_result_json(resultado)
+        if verbose_output():
+            print("\n" + "="*70)
+            print("📊 RESULTADO GUARDADO EN JSON")
+            print("="*70)
+            print(json.dumps(resultado, indent=2, ensure_ascii=False))
+            print("="*70 + "\n")
     else:
         print("\n" + "="*70)
         print("❌ No se pudo obtener el resultado")
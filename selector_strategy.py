@@ -0,0 +1,140 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+
+def selector_key(selector):
+    """Texto que identifica a un selector: 'h3', "//button[@id='L2AGLb']"..."""
+    return selector if isinstance(selector, str) else selector[1]
+
+
+class SelectorStrategy:
+    """
+    Reordena las cascadas de selectores según cuál acertó más recientemente
+
+    Por cada buscador y campo ('container', 'results', 'title', 'snippet',
+    'cookie') guarda cuántas veces ganó cada selector y cuándo fue la última. Al
+    pedir una cascada, los ganadores van primero (el más reciente antes) y detrás
+    el resto en su orden original, así que nunca se pierde un selector de
+    respaldo. Los selectores genéricos (`pinned`, p. ej. 'li' o './/a') se quedan
+    siempre al final en su orden: aciertan en casi cualquier página, y si se
+    adelantaran taparían a los específicos para siempre. Sus aciertos tampoco se
+    anotan, ni los de un selector de resultados cuyos elementos no tienen en su
+    mayoría título y URL (ha encontrado otra cosa: búsquedas relacionadas, menús...).
+    Las estadísticas se guardan en un JSON para sobrevivir entre ejecuciones.
+
+    Args:
+        path: Archivo JSON de estadísticas
+        save_interval: Segundos mínimos entre escrituras a disco
+    """
+
+    def __init__(self, path, save_interval=5.0):
+        self.path = path
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = 0.0
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._stats = json.load(f)
+        except (OSError, ValueError):
+            self._stats = {}
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv("SELECTOR_STATS_PATH", "output/selector_stats.json"))
+
+    def order(self, engine, field, selectors, key=selector_key, pinned=()):
+        """
+        Devuelve `selectors` con los últimos ganadores al principio
+
+        Args:
+            key: Función que extrae el texto del selector de cada elemento
+            pinned: Textos de los selectores genéricos, que se quedan al final
+        """
+        specific = [i for i in range(len(selectors)) if key(selectors[i]) not in pinned]
+        generic = [i for i in range(len(selectors)) if key(selectors[i]) in pinned]
+        with self._lock:
+            stats = self._stats.get(engine, {}).get(field, {})
+            if stats:
+                specific.sort(key=lambda i: (-stats.get(key(selectors[i]), {}).get("last", 0), i))
+        return [selectors[i] for i in specific + generic]
+
+    def record(self, engine, field, selector, pinned=()):
+        """Anota que `selector` (texto) encontró el campo. None o un selector genérico: no se anota"""
+        if not selector or selector in pinned:
+            return
+        with self._lock:
+            entry = self._stats.setdefault(engine, {}).setdefault(field, {}).setdefault(
+                selector, {"hits": 0, "last": 0}
+            )
+            entry["hits"] += 1
+            entry["last"] = time.time()
+            self._dirty = True
+            due = time.monotonic() - self._last_save >= self.save_interval
+        if due:
+            self.save()
+
+    def record_extraction(self, engine, extraction, pinned=()):
+        """Anota los selectores ganadores de un resultado de extract_results/parse_results"""
+        self.record(engine, "container", extraction["container_selector"], pinned)
+        results = extraction["results"]
+        complete = sum(1 for result in results if result["title"] and result["url"])
+        if complete * 2 > len(results):
+            self.record(engine, "results", extraction["result_selector"], pinned)
+        for result in results:
+            self.record(engine, "title", result["title_selector"], pinned)
+            self.record(engine, "snippet", result["snippet_selector"], pinned)
+
+    def save(self):
+        """Escribe las estadísticas (de forma atómica) si han cambiado"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._stats, ensure_ascii=False, indent=1)
+            self._dirty = False
+            self._last_save = time.monotonic()
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            with self._lock:
+                self._dirty = True
+
+
+class _StaticStrategy:
+    """Estrategia nula (ADAPTIVE_SELECTORS=false): orden fijo, sin estadísticas"""
+
+    def order(self, engine, field, selectors, key=selector_key, pinned=()):
+        return list(selectors)
+
+    def record(self, engine, field, selector, pinned=()):
+        pass
+
+    def record_extraction(self, engine, extraction, pinned=()):
+        pass
+
+    def save(self):
+        pass
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_strategy():
+    """Estrategia compartida por el proceso (se guarda al salir)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            if os.getenv("ADAPTIVE_SELECTORS", "true").lower() == "true":
+                _shared = SelectorStrategy.from_env()
+                atexit.register(_shared.save)
+            else:
+                _shared = _StaticStrategy()
+        return _shared
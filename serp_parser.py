@@ -0,0 +1,236 @@
+"""
+Parser offline de páginas de resultados (SERP) sobre HTML guardado
+
+Aplica las mismas tablas de selectores que el scraper en vivo, pero sobre el
+HTML (`driver.page_source` o las capturas de output/debug/html/, que están
+comprimidas con gzip) con lxml, sin necesidad de navegador.
+
+Uso:
+    python serp_parser.py pagina.html [otra.html.gz ...] [--engine bing|google]
+    python serp_parser.py carpeta_con_html/ --engine google --bench 5
+"""
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+from urllib.parse import urljoin
+
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+
+# Etiquetas que en innerText empiezan una línea nueva
+_BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "figcaption", "figure", "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table", "td", "th",
+    "tr", "ul",
+}
+_SKIP_TAGS = {"script", "style", "noscript", "template"}
+
+_css_cache = {}
+
+
+def _css(selector):
+    """CSSSelector compilado (se cachea: compilar cuesta más que evaluar)"""
+    compiled = _css_cache.get(selector)
+    if compiled is None:
+        compiled = _css_cache[selector] = CSSSelector(selector)
+    return compiled
+
+
+def _find_first(root, selector_type, selector_value):
+    if selector_type == "xpath":
+        found = root.xpath(selector_value)
+    else:
+        found = _css(selector_value)(root)
+    return found[0] if found else None
+
+
+def inner_text(element):
+    """Aproximación a innerText: texto sin scripts, con saltos de línea entre bloques"""
+    parts = []
+
+    def _walk(el):
+        tag = el.tag if isinstance(el.tag, str) else ""
+        if tag in _SKIP_TAGS:
+            return
+        if tag in _BLOCK_TAGS:
+            parts.append("\n")
+        if el.text and tag:
+            parts.append(el.text)
+        for child in el:
+            _walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if tag in _BLOCK_TAGS:
+            parts.append("\n")
+
+    _walk(element)
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _first_text(root, selectors):
+    for selector_type, selector_value in selectors:
+        try:
+            element = _find_first(root, selector_type, selector_value)
+        except Exception:
+            continue
+        text = inner_text(element) if element is not None else ""
+        if text:
+            return text, selector_value
+    return None, None
+
+
+def _href_of(element, base_url):
+    link = element if element.tag == "a" else _find_first(element, "css selector", "a")
+    href = link.get("href") if link is not None else None
+    if not href or href.startswith("javascript"):
+        return None
+    return urljoin(base_url, href) if base_url else href
+
+
+def parse_results(page_html, container_selectors, result_selectors, title_selectors,
+                  snippet_selectors, base_url=None, min_text=10, limit=None):
+    """
+    Extrae los resultados de una página de resultados a partir de su HTML
+
+    Devuelve el mismo diccionario que `extraction.extract_results`, para que el
+    resto del scraper no distinga si los datos vienen del navegador o del HTML.
+
+    Args:
+        page_html: HTML de la página (str o bytes)
+        base_url: URL de la página, para resolver enlaces relativos
+        (el resto, igual que en extraction.extract_results)
+    """
+    start = time.monotonic()
+    document = lxml_html.fromstring(page_html)
+    t0 = time.monotonic()
+
+    container, container_selector = None, None
+    for selector in container_selectors:
+        found = _css(selector)(document)
+        if found:
+            container, container_selector = found[0], selector
+            break
+    if container is None:
+        body = document.find(".//body")
+        container = body if body is not None else document
+    t1 = time.monotonic()
+
+    nodes, result_selector, texts = [], None, {}
+    for selector in result_selectors:
+        nodes = []
+        for element in _css(selector)(container):
+            text = inner_text(element)
+            if len(text) > min_text:
+                nodes.append(element)
+                texts[element] = text
+        if nodes:
+            result_selector = selector
+            break
+    if limit:
+        nodes = nodes[:limit]
+    t2 = time.monotonic()
+
+    results = []
+    for element in nodes:
+        title, title_selector = _first_text(element, title_selectors)
+        snippet, snippet_selector = _first_text(element, snippet_selectors)
+        results.append({
+            "title": title,
+            "title_selector": title_selector,
+            "url": _href_of(element, base_url),
+            "snippet": snippet,
+            "snippet_selector": snippet_selector,
+            "text": texts[element],
+        })
+
+    return {
+        "container_selector": container_selector,
+        "result_selector": result_selector,
+        "results": results,
+        "timings": {
+            "html_parse": (t0 - start) * 1000,
+            "container_lookup": (t1 - t0) * 1000,
+            "selector_cascade": (t2 - t1) * 1000,
+            "field_extraction": (time.monotonic() - t2) * 1000,
+        },
+        "elapsed_ms": (time.monotonic() - start) * 1000,
+    }
+
+
+def _expand_paths(paths):
+    """Convierte carpetas en la lista de sus archivos .html y .html.gz"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for pattern in ("*.html", "*.html.gz"):
+                files.extend(sorted(glob.glob(os.path.join(path, "**", pattern), recursive=True)))
+        else:
+            files.append(path)
+    return files
+
+
+def main(argv):
+    # Las tablas de selectores viven en el scraper; se importan aquí para que el
+    # módulo pueda usarse desde search_google.py sin import circular
+    from search_google import (CONTAINER_SELECTORS, ENGINE_URLS, RESULT_SELECTORS,
+                               SNIPPET_SELECTORS, TITLE_SELECTORS)
+    from extraction import normalize_result
+
+    engine = "bing"
+    bench_rounds = 0
+    paths = []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--engine":
+            engine = next(args, engine).lower()
+        elif arg == "--bench":
+            bench_rounds = int(next(args, "1"))
+        else:
+            paths.append(arg)
+
+    files = _expand_paths(paths or [os.path.join(os.getenv("DEBUG_DIR", "output/debug"), "html")])
+    if not files:
+        print("No se encontraron archivos HTML", file=sys.stderr)
+        return 1
+    pages = []
+    for path in files:
+        with (gzip.open if path.endswith(".gz") else open)(path, "rb") as f:
+            pages.append((path, f.read()))
+
+    def _parse(page_html):
+        return parse_results(
+            page_html,
+            CONTAINER_SELECTORS[engine],
+            [selector for selector, _ in RESULT_SELECTORS[engine]],
+            TITLE_SELECTORS[engine],
+            SNIPPET_SELECTORS[engine],
+            base_url=ENGINE_URLS[engine],
+        )
+
+    if bench_rounds:
+        _parse(pages[0][1])  # Calentar la caché de selectores
+        start = time.monotonic()
+        for _ in range(bench_rounds):
+            for _, page_html in pages:
+                _parse(page_html)
+        elapsed = time.monotonic() - start
+        total = bench_rounds * len(pages)
+        print(f"{total} páginas en {elapsed:.2f}s → {total / elapsed:.1f} páginas/segundo "
+              f"({elapsed / total * 1000:.2f} ms/página, motor {engine})")
+        return 0
+
+    for path, page_html in pages:
+        parsed = _parse(page_html)
+        for rank, raw in enumerate(parsed["results"], start=1):
+            record = {"file": path, "engine": engine, "rank": rank, **normalize_result(raw)}
+            print(json.dumps(record, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,317 @@
+"""
+Cola de trabajos para repartir búsquedas entre varios workers (contenedores o máquinas)
+
+Los productores encolan búsquedas con `enqueue()` y cada worker las toma con
+`lease()`: el trabajo queda reservado (invisible para los demás) durante
+`visibility` segundos. El worker lo renueva con `extend()` mientras busca y al
+terminar llama a `complete()` o `fail()`. Si el worker muere sin hacerlo, la
+reserva caduca y otro worker vuelve a tomar el trabajo, así que nada se pierde.
+
+`complete()` es idempotente: el resultado de un trabajo se guarda una sola vez
+aunque dos workers lleguen a terminarlo (p. ej. uno lento cuya reserva caducó),
+y solo el primero recibe True para publicar el resultado en otros sitios.
+
+Encolar una búsqueda que ya está pendiente no la duplica. Si falló, se reabre;
+si ya terminó, solo se reabre cuando su resultado tiene más de `reopen_after`
+segundos (otra ejecución del productor, p. ej. al día siguiente): volver a
+encolar el mismo archivo enseguida no repite búsquedas ni resultados. `purge()`
+borra los trabajos terminados o fallidos antiguos y sus resultados.
+
+El backend por defecto es SQLite (un archivo en un volumen compartido, sin
+servicios externos). Otros backends implementan la interfaz de `WorkQueue` y se
+registran con `register_backend()`.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from result_cache import normalize_query
+
+# Estados de un trabajo
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """Trabajo reservado por un worker. `token` identifica la reserva"""
+    id: str
+    query: str
+    engine: str
+    max_pages: int
+    attempts: int
+    token: str
+    worker: str
+
+
+def job_key(query, engine=None, max_pages=None):
+    """Identificador por defecto: la misma búsqueda encolada dos veces es el mismo trabajo"""
+    raw = f"{engine or ''}|{normalize_query(query)}|{max_pages or ''}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class WorkQueue:
+    """
+    Interfaz de las colas de trabajos
+
+    Args:
+        visibility: Segundos que dura una reserva si no se renueva
+        max_attempts: Reservas de un trabajo antes de darlo por fallido
+        retry_delay: Segundos que espera un trabajo fallido antes de reintentarse
+        reopen_after: Antigüedad (segundos) a partir de la cual volver a encolar un
+            trabajo terminado lo reabre; antes se ignora
+    """
+
+    def __init__(self, visibility=300, max_attempts=3, retry_delay=60, reopen_after=86400):
+        self.visibility = visibility
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.reopen_after = reopen_after
+
+    def enqueue(self, query, engine=None, max_pages=None, job_id=None):
+        """
+        Añade un trabajo, o reabre uno fallido o terminado hace más de `reopen_after`
+        segundos con el mismo id
+
+        Returns:
+            (id, True si queda pendiente por esta llamada / False si ya estaba pendiente)
+        """
+        raise NotImplementedError
+
+    def lease(self, worker):
+        """Reserva el siguiente trabajo disponible. Devuelve un Job o None"""
+        raise NotImplementedError
+
+    def extend(self, job):
+        """Renueva la reserva. False si ya no es nuestra (caducó y la tomó otro)"""
+        raise NotImplementedError
+
+    def complete(self, job, result):
+        """Guarda el resultado. True si es la primera vez que se completa el trabajo"""
+        raise NotImplementedError
+
+    def fail(self, job, error):
+        """Libera el trabajo para reintentarlo más tarde (o lo marca fallido)"""
+        raise NotImplementedError
+
+    def result(self, job_id):
+        """Resultado guardado de un trabajo, o None"""
+        raise NotImplementedError
+
+    def stats(self):
+        """Número de trabajos por estado"""
+        raise NotImplementedError
+
+    def purge(self, older_than):
+        """Borra los trabajos terminados o fallidos hace más de `older_than` segundos. Devuelve cuántos"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SQLiteQueue(WorkQueue):
+    """
+    Cola en un archivo SQLite (modo WAL), compartible entre procesos y contenedores
+    de la misma máquina a través de un volumen. No usar sobre NFS/SMB.
+
+    Args:
+        path: Archivo SQLite (se crea el directorio si no existe)
+    """
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                engine TEXT,
+                max_pages INTEGER,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                token TEXT,
+                worker TEXT,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_available ON jobs (status, available_at)")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                job_id TEXT PRIMARY KEY,
+                worker TEXT NOT NULL,
+                finished REAL NOT NULL,
+                value TEXT NOT NULL
+            )
+        """)
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv("QUEUE_PATH", "output/queue.sqlite3"), **_options_from_env())
+
+    def _transaction(self, fn):
+        """Ejecuta `fn(db)` en una transacción que bloquea la escritura a otros procesos"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                value = fn(self._db)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return value
+
+    def enqueue(self, query, engine=None, max_pages=None, job_id=None):
+        job_id = job_id or job_key(query, engine, max_pages)
+        now = time.time()
+
+        def _insert(db):
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO jobs (id, query, engine, max_pages, status, available_at, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (job_id, query, engine, max_pages, PENDING, now, now, now)
+            )
+            if cursor.rowcount == 1:
+                return True
+            # Fallido, o terminado hace tiempo: se reabre y se olvida el resultado
+            # anterior para que complete() vuelva a publicarlo
+            reopened = db.execute(
+                "UPDATE jobs SET status=?, attempts=0, available_at=?, token=NULL, worker=NULL, error=NULL, "
+                "updated=? WHERE id=? AND (status=? OR (status=? AND updated<=?))",
+                (PENDING, now, now, job_id, FAILED, DONE, now - self.reopen_after),
+            ).rowcount == 1
+            if reopened:
+                db.execute("DELETE FROM results WHERE job_id=?", (job_id,))
+            return reopened
+        return job_id, self._transaction(_insert)
+
+    def lease(self, worker):
+        token = uuid.uuid4().hex
+
+        def _take(db):
+            now = time.time()
+            # Reservas caducadas de trabajos que ya agotaron sus intentos: fallidos
+            db.execute(
+                "UPDATE jobs SET status=?, error=COALESCE(error, 'reserva caducada'), updated=? "
+                "WHERE status=? AND available_at<=? AND attempts>=?",
+                (FAILED, now, PENDING, now, self.max_attempts),
+            )
+            row = db.execute(
+                "SELECT id, query, engine, max_pages, attempts FROM jobs "
+                "WHERE status=? AND available_at<=? ORDER BY available_at LIMIT 1", (PENDING, now)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET attempts=attempts+1, available_at=?, token=?, worker=?, updated=? WHERE id=?",
+                (now + self.visibility, token, worker, now, row[0]),
+            )
+            return Job(row[0], row[1], row[2], row[3], row[4] + 1, token, worker)
+        return self._transaction(_take)
+
+    def extend(self, job):
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET available_at=?, updated=? WHERE id=? AND token=? AND status=?",
+                (now + self.visibility, now, job.id, job.token, PENDING),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job, result):
+        data = json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+
+        def _finish(db):
+            now = time.time()
+            first = db.execute(
+                "INSERT OR IGNORE INTO results (job_id, worker, finished, value) VALUES (?, ?, ?, ?)",
+                (job.id, job.worker, now, data),
+            ).rowcount == 1
+            db.execute("UPDATE jobs SET status=?, error=NULL, updated=? WHERE id=?", (DONE, now, job.id))
+            return first
+        return self._transaction(_finish)
+
+    def fail(self, job, error):
+        def _release(db):
+            now = time.time()
+            # Solo si la reserva sigue siendo nuestra; si no, otro worker ya lo tiene
+            db.execute(
+                "UPDATE jobs SET status=CASE WHEN attempts>=? THEN ? ELSE status END, "
+                "available_at=?, token=NULL, error=?, updated=? WHERE id=? AND token=? AND status=?",
+                (self.max_attempts, FAILED, now + self.retry_delay, str(error), now, job.id, job.token, PENDING),
+            )
+        self._transaction(_release)
+
+    def result(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM results WHERE job_id=?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT CASE WHEN status=? AND token IS NOT NULL AND available_at>? THEN 'leased' "
+                "ELSE status END, COUNT(*) FROM jobs GROUP BY 1", (PENDING, now)
+            ).fetchall()
+        counts = {PENDING: 0, "leased": 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def purge(self, older_than):
+        def _delete(db):
+            params = (DONE, FAILED, time.time() - older_than)
+            db.execute(
+                "DELETE FROM results WHERE job_id IN "
+                "(SELECT id FROM jobs WHERE status IN (?, ?) AND updated<?)", params
+            )
+            return db.execute("DELETE FROM jobs WHERE status IN (?, ?) AND updated<?", params).rowcount
+        return self._transaction(_delete)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _options_from_env():
+    return {
+        "visibility": float(os.getenv("QUEUE_VISIBILITY", "300")),
+        "max_attempts": int(os.getenv("QUEUE_MAX_ATTEMPTS", "3")),
+        "retry_delay": float(os.getenv("QUEUE_RETRY_DELAY", "60")),
+        "reopen_after": float(os.getenv("QUEUE_REOPEN_AFTER", "86400")),
+    }
+
+
+BACKENDS = {"sqlite": SQLiteQueue.from_env}
+
+
+def register_backend(name, factory):
+    """Registra un backend: `factory()` devuelve una WorkQueue configurada desde .env"""
+    BACKENDS[name] = factory
+
+
+def open_queue():
+    """Abre la cola configurada en .env (QUEUE_BACKEND, por defecto 'sqlite')"""
+    backend = os.getenv("QUEUE_BACKEND", "sqlite").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de cola desconocido: {backend} (disponibles: {', '.join(BACKENDS)})")
+    return BACKENDS[backend]()